@@ -3,26 +3,60 @@ from __future__ import annotations
 from copy import deepcopy
 from typing import Any
 
+from field_backend import get_backend
+
+# modular exponentiation / inversion on Fq values, gmpy2 when available
+_powmod, _invert = get_backend()
+
+
+# Per-modulus subclasses created by fq_class / FieldExtBase._for_q
+_fq_classes = {}
+
+
+def fq_class(Q: int):
+    """
+    Subclass of Fq with the modulus Q bound at the class level, so that
+    elements only carry their value.
+    """
+    if Q not in _fq_classes:
+        _fq_classes[Q] = type("Fq", (Fq,), {"__slots__": (), "Q": Q})
+    return _fq_classes[Q]
+
 
 class Fq:
     """
     Represents an element of a finite field mod a prime q.
+
+    Fq(Q, value) returns an instance of fq_class(Q); Q lives on the class.
     """
 
+    __slots__ = ("value",)
+
     value: int
+    Q: int
     extension: int = 1
 
-    def __init__(self, Q: int, value: int):
-        self.Q = Q
-        self.value = value % Q
+    def __new__(cls, Q: int, value: int):
+        ret = object.__new__(_fq_classes[Q] if Q in _fq_classes else fq_class(Q))
+        ret.value = value % Q
+        return ret
+
+    def __reduce__(self):
+        return (Fq, (self.Q, self.value))
 
     def __neg__(self) -> Fq:
-        return Fq(self.Q, -self.value)
+        ret = object.__new__(type(self))
+        ret.value = -self.value % self.Q
+        return ret
 
     def __add__(self, other: Fq) -> Fq:
-        if not isinstance(other, Fq):
+        try:
+            v = self.value + other.value
+        except AttributeError:
             return NotImplemented
-        return Fq(self.Q, self.value + other.value)
+        ret = object.__new__(type(self))
+        ret.value = v % self.Q
+        return ret
 
     def __radd__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
@@ -30,28 +64,55 @@ class Fq:
         return self.__add__(other)
 
     def __sub__(self, other: Fq) -> Fq:
-        if not isinstance(other, Fq):
+        try:
+            v = self.value - other.value
+        except AttributeError:
             return NotImplemented
-        return Fq(self.Q, self.value - other.value)
+        ret = object.__new__(type(self))
+        ret.value = v % self.Q
+        return ret
 
     def __rsub__(self, other: Fq) -> Fq:
         if not isinstance(other, Fq):
             return NotImplemented
-        return Fq(self.Q, other.value - self.value)
+        return other.__sub__(self)
 
     def __mul__(self, other: Fq) -> Fq:
-        if not isinstance(other, Fq):
+        try:
+            v = self.value * other.value
+        except AttributeError:
             return NotImplemented
-        return Fq(self.Q, self.value * other.value)
+        ret = object.__new__(type(self))
+        ret.value = v % self.Q
+        return ret
 
     def __rmul__(self, other: Fq) -> Fq:
         return self.__mul__(other)
 
+    # In-place accumulation for inner loops.  These mutate self, so only use
+    # them on elements that are not shared (e.g. freshly created buffers).
+    def iadd(self, other: Fq) -> Fq:
+        self.value = (self.value + other.value) % self.Q
+        return self
+
+    def isub(self, other: Fq) -> Fq:
+        self.value = (self.value - other.value) % self.Q
+        return self
+
+    def imul(self, other: Fq) -> Fq:
+        self.value = self.value * other.value % self.Q
+        return self
+
+    # self += a * b
+    def iadd_mul(self, a: Fq, b: Fq) -> Fq:
+        self.value = (self.value + a.value * b.value) % self.Q
+        return self
+
     def __eq__(self, other) -> bool:
         if not isinstance(other, type(self)):
             return False
         else:
-            return self.value == other.value and self.Q == other.Q
+            return self.value == other.value
 
     def __lt__(self, other: Fq) -> bool:
         return self.value < other.value
@@ -82,30 +143,16 @@ class Fq:
         return Fq(q, int.from_bytes(buffer, "big"))
 
     def __pow__(self, other) -> Fq:
-        if other == 0:
-            return Fq(self.Q, 1)
-        elif other == 1:
-            return Fq(self.Q, self.value)
-        elif other % 2 == 0:
-            return Fq(self.Q, self.value * self.value) ** (other // 2)
-        else:
-            return Fq(self.Q, self.value * self.value) ** (other // 2) * self
+        return Fq(self.Q, _powmod(self.value, other, self.Q))
 
     def qi_power(self, i: int) -> Fq:
         return self
 
     def __invert__(self) -> Fq:
         """
-        Extended euclidian algorithm for inversion.
+        Modular inversion through the field backend, ~Fq(Q, 0) is 0.
         """
-        x0, x1, y0, y1 = 1, 0, 0, 1
-        a = int(self.Q)
-        b = int(self.value)
-        while a != 0:
-            q, b, a = b // a, a, b % a
-            x0, x1 = x1, x0 - q * x1
-            y0, y1 = y1, y0 - q * y1
-        return Fq(self.Q, x0)
+        return Fq(self.Q, _invert(self.value, self.Q))
 
     def __floordiv__(self, other) -> Fq:
         if isinstance(other, int) and not isinstance(other, type(self)):
@@ -120,12 +167,12 @@ class Fq:
     def modsqrt(self) -> Fq:
         if int(self.value) == 0:
             return Fq(self.Q, 0)
-        if pow(int(self.value), (self.Q - 1) // 2, self.Q) != 1:
+        if _powmod(int(self.value), (self.Q - 1) // 2, self.Q) != 1:
             raise ValueError("No sqrt exists")
         if self.Q % 4 == 3:
-            return Fq(self.Q, pow(int(self.value), (self.Q + 1) // 4, self.Q))
+            return Fq(self.Q, _powmod(int(self.value), (self.Q + 1) // 4, self.Q))
         if self.Q % 8 == 5:
-            return Fq(self.Q, pow(int(self.value), (self.Q + 3) // 8, self.Q))
+            return Fq(self.Q, _powmod(int(self.value), (self.Q + 3) // 8, self.Q))
 
         # p % 8 == 1. Tonelli Shanks algorithm for finding square root
         S = 0
@@ -137,15 +184,15 @@ class Fq:
 
         z = 0
         for i in range(self.Q):
-            euler = pow(i, (self.Q - 1) // 2, self.Q)
+            euler = _powmod(i, (self.Q - 1) // 2, self.Q)
             if euler == -1 % self.Q:
                 z = i
                 break
 
         M = S
-        c = pow(z, q, self.Q)
-        t = pow(self.value, q, self.Q)
-        R = pow(self.value, (q + 1) // 2, self.Q)
+        c = _powmod(z, q, self.Q)
+        t = _powmod(self.value, q, self.Q)
+        R = _powmod(self.value, (q + 1) // 2, self.Q)
 
         while True:
             if t == 0:
@@ -155,11 +202,11 @@ class Fq:
             i = 0
             f = t
             while f != 1:
-                f = pow(f, 2, self.Q)
+                f = _powmod(f, 2, self.Q)
                 i += 1
-            b = pow(c, pow(2, M - i - 1, self.Q), self.Q)
+            b = _powmod(c, _powmod(2, M - i - 1, self.Q), self.Q)
             M = i
-            c = pow(b, 2, self.Q)
+            c = _powmod(b, 2, self.Q)
             t = (t * c) % self.Q
             R = (R * b) % self.Q
 
@@ -184,15 +231,37 @@ class FieldExtBase(tuple):
     Represents an extension of a field (or extension of an extension).
     The elements of the tuple can be other FieldExtBase or they can be
     Fq elements. For example, Fq2 = (Fq, Fq). Fq12 = (Fq6, Fq6), etc.
+
+    Like Fq, Fq2(Q, ...) returns an instance of a per-modulus subclass
+    holding Q and root at the class level, and instances have no __dict__.
     """
 
+    __slots__ = ()
+
     root = None
     extension: int
     embedding: int
     basefield: Any
     Q: int
 
+    # Subclass of cls bound to Q
+    @classmethod
+    def _for_q(cls, Q):
+        k = cls._per_q.get(Q)
+        if k is None:
+            generic = cls._generic
+            k = type(generic.__name__, (generic,), {"__slots__": (), "Q": Q})
+            cls._per_q[Q] = k
+            if generic is Fq2:
+                k.root = Fq(Q, -1)
+            elif generic is Fq6:
+                k.root = Fq2(Q, Fq.one(Q), Fq.one(Q))
+            elif generic is Fq12:
+                k.root = Fq6(Q, Fq2.zero(Q), Fq2.one(Q), Fq2.zero(Q))
+        return k
+
     def __new__(cls, Q, *args):
+        cls = cls._for_q(Q)
         new_args = args[:]
         try:
             arg_extension = args[0].extension
@@ -208,19 +277,18 @@ class FieldExtBase(tuple):
             for arg in new_args:
                 assert arg.extension == arg_extension
         assert all(isinstance(arg, cls.basefield) for arg in new_args)
-        ret = super().__new__(cls, new_args)
-        ret.Q = Q
-        return ret
+        return tuple.__new__(cls, new_args)
+
+    def __reduce__(self):
+        return (self._generic, (self.Q,) + tuple(self))
 
     def __neg__(self):
-        cls = type(self)
-        ret = super().__new__(cls, (-x for x in self))
-        ret.Q = self.Q
-        ret.root = self.root
-        return ret
+        return tuple.__new__(type(self), (-x for x in self))
 
     def __add__(self, other):
         cls = type(self)
+        if type(other) is cls:
+            return tuple.__new__(cls, [a + b for a, b in zip(self, other)])
         if not isinstance(other, cls):
             if type(other) != int and other.extension > self.extension:
                 return NotImplemented
@@ -229,15 +297,14 @@ class FieldExtBase(tuple):
         else:
             other_new = other
 
-        ret = super().__new__(cls, (a + b for a, b in zip(self, other_new)))
-        ret.Q = self.Q
-        ret.root = self.root
-        return ret
+        return tuple.__new__(cls, (a + b for a, b in zip(self, other_new)))
 
     def __radd__(self, other):
         return self.__add__(other)
 
     def __sub__(self, other):
+        if type(other) is type(self):
+            return tuple.__new__(type(self), [a - b for a, b in zip(self, other)])
         return self + (-other)
 
     def __rsub__(self, other):
@@ -246,30 +313,40 @@ class FieldExtBase(tuple):
     def __mul__(self, other):
         cls = type(self)
         if isinstance(other, int):
-            ret = super().__new__(cls, (a * other for a in self))
-            ret.Q = self.Q
-            ret.root = self.root
-            return ret
+            return tuple.__new__(cls, (a * other for a in self))
         if cls.extension < other.extension:
             return NotImplemented
 
-        buf = [cls.basefield.zero(self.Q) for _ in self]
+        embedding = cls.embedding
+        if cls.extension == other.extension and cls.basefield is Fq:
+            # accumulate the unreduced products, one reduction per coefficient
+            Q = self.Q
+            r = cls.root.value
+            acc = [0] * embedding
+            for i, x in enumerate(self):
+                xv = x.value
+                for j, y in enumerate(other):
+                    if i + j >= embedding:
+                        acc[i + j - embedding] += xv * y.value * r
+                    else:
+                        acc[i + j] += xv * y.value
+            return tuple.__new__(cls, [Fq(Q, v) for v in acc])
 
+        buf = [None] * embedding
         for i, x in enumerate(self):
             if cls.extension == other.extension:
                 for j, y in enumerate(other):
                     if x and y:
-                        if i + j >= self.embedding:
-                            buf[(i + j) % self.embedding] += x * y * self.root
-                        else:
-                            buf[(i + j) % self.embedding] += x * y
+                        t = x * y
+                        if i + j >= embedding:
+                            t = t * cls.root
+                        k = (i + j) % embedding
+                        buf[k] = t if buf[k] is None else buf[k] + t
             else:
                 if x:
                     buf[i] = x * other
-        ret = super().__new__(cls, buf)
-        ret.Q = self.Q
-        ret.root = self.root
-        return ret
+        zero = cls.basefield.zero(self.Q)
+        return tuple.__new__(cls, [zero if b is None else b for b in buf])
 
     def __rmul__(self, other):
         return self.__mul__(other)
@@ -291,7 +368,7 @@ class FieldExtBase(tuple):
                 return NotImplemented
             return NotImplemented
         else:
-            return super().__eq__(other) and self.Q == other.Q
+            return tuple.__eq__(self, other)
 
     def __lt__(self, other):
         # Reverse the order for comparison (3i + 1 > 2i + 7)
@@ -325,7 +402,7 @@ class FieldExtBase(tuple):
     def __bytes__(self):
         sum_bytes = bytes([])
         for x in reversed(self):
-            if type(x) != FieldExtBase and type(x) != Fq:
+            if not isinstance(x, FieldExtBase) and not isinstance(x, Fq):
                 x = Fq.from_fq(self.Q, x)
             sum_bytes += bytes(x)
         return sum_bytes
@@ -345,13 +422,12 @@ class FieldExtBase(tuple):
         assert isinstance(e, int) and e >= 0
         ans = type(self).one(self.Q)
         base = self
-        ans.root = self.root
 
         while e:
             if e & 1:
                 ans *= base
 
-            base *= base
+            base = base.square()
             e >>= 1
 
         return ans
@@ -359,8 +435,8 @@ class FieldExtBase(tuple):
     def __bool__(self):
         return any(x for x in self)
 
-    def set_root(self, _root):
-        self.root = _root
+    def square(self):
+        return self * self
 
     @classmethod
     def zero(cls, Q):
@@ -372,25 +448,13 @@ class FieldExtBase(tuple):
 
     @classmethod
     def from_fq(cls, Q, fq):
+        cls = cls._for_q(Q)
         y = cls.basefield.from_fq(Q, fq)
         z = cls.basefield.zero(Q)
-        ret = super().__new__(cls, (z if i else y for i in range(cls.embedding)))
-        ret.Q = Q
-        if cls == Fq2:
-            ret.set_root(Fq(Q, -1))
-        elif cls == Fq6:
-            ret.set_root(Fq2(Q, Fq.one(Q), Fq.one(Q)))
-        elif cls == Fq12:
-            r = Fq6(Q, Fq2.zero(Q), Fq2.one(Q), Fq2.zero(Q))
-            ret.set_root(r)
-        return ret
+        return tuple.__new__(cls, (z if i else y for i in range(cls.embedding)))
 
     def __deepcopy__(self, memo):
-        cls = type(self)
-        ret = super().__new__(cls, (deepcopy(a, memo) for a in self))
-        ret.Q = self.Q
-        ret.root = self.root
-        return ret
+        return tuple.__new__(type(self), (deepcopy(a, memo) for a in self))
 
     def qi_power(self, i):
         if self.Q != bls12381_q:
@@ -399,26 +463,51 @@ class FieldExtBase(tuple):
         i %= cls.extension
         if i == 0:
             return self
-        ret = super().__new__(
+        return tuple.__new__(
             cls,
             (
                 a.qi_power(i) * frob_coeffs[cls.extension, i, j] if j else a.qi_power(i)
                 for j, a in enumerate(self)
             ),
         )
-        ret.Q = self.Q
-        ret.root = self.root
-        return ret
 
 
 class Fq2(FieldExtBase):
     # Fq2 is constructed as Fq(u) / (u2 - β) where β = -1
+    __slots__ = ()
+    _per_q = {}
     extension = 2
     embedding = 2
     basefield = Fq
 
-    def __init__(self, Q, *args):
-        super().set_root(Fq(Q, -1))
+    # Fq2 element of the same class from integer coordinates
+    def _new(self, c0: int, c1: int) -> Fq2:
+        return tuple.__new__(type(self), (Fq(self.Q, c0), Fq(self.Q, c1)))
+
+    def __add__(self, other):
+        if type(other) is not type(self):
+            return FieldExtBase.__add__(self, other)
+        return self._new(self[0].value + other[0].value, self[1].value + other[1].value)
+
+    def __sub__(self, other):
+        if type(other) is not type(self):
+            return FieldExtBase.__sub__(self, other)
+        return self._new(self[0].value - other[0].value, self[1].value - other[1].value)
+
+    def __mul__(self, other):
+        # Karatsuba, 3 base field multiplications
+        if type(other) is not type(self):
+            return FieldExtBase.__mul__(self, other)
+        a0, a1 = self[0].value, self[1].value
+        b0, b1 = other[0].value, other[1].value
+        t0 = a0 * b0
+        t1 = a1 * b1
+        return self._new(t0 - t1, (a0 + a1) * (b0 + b1) - t0 - t1)
+
+    def square(self) -> Fq2:
+        # complex squaring, (a0 + a1)(a0 - a1) + 2 a0 a1 u
+        a0, a1 = self[0].value, self[1].value
+        return self._new((a0 + a1) * (a0 - a1), 2 * a0 * a1)
 
     def __invert__(self) -> Fq2:
         a, b = self
@@ -428,8 +517,8 @@ class Fq2(FieldExtBase):
 
     def mul_by_nonresidue(self) -> Fq2:
         # multiply by u + 1
-        a, b = self
-        return Fq2(self.Q, a - b, a + b)
+        a0, a1 = self[0].value, self[1].value
+        return self._new(a0 - a1, a0 + a1)
 
     def modsqrt(self) -> Fq2:
         """
@@ -457,13 +546,12 @@ class Fq2(FieldExtBase):
 
 class Fq6(FieldExtBase):
     # Fq6 is constructed as Fq2(v) / (v3 - ξ) where ξ = u + 1
+    __slots__ = ()
+    _per_q = {}
     extension = 6
     embedding = 3
     basefield = Fq2
 
-    def __init__(self, Q: int, *args):
-        super().set_root(Fq2(Q, Fq.one(Q), Fq.one(Q)))
-
     def __invert__(self) -> Fq6:
         a, b, c = self
         g0 = a * a - b * c.mul_by_nonresidue()
@@ -477,23 +565,165 @@ class Fq6(FieldExtBase):
     def mul_by_nonresidue(self) -> Fq6:
         # multiply by v
         a, b, c = self
-        return Fq6(self.Q, c * self.root, a, b)
+        return tuple.__new__(type(self), (c.mul_by_nonresidue(), a, b))
+
+    def __mul__(self, other):
+        # Karatsuba, 6 Fq2 multiplications
+        if type(other) is not type(self):
+            return FieldExtBase.__mul__(self, other)
+        a0, a1, a2 = self
+        b0, b1, b2 = other
+        t0 = a0 * b0
+        t1 = a1 * b1
+        t2 = a2 * b2
+        c0 = ((a1 + a2) * (b1 + b2) - t1 - t2).mul_by_nonresidue() + t0
+        c1 = (a0 + a1) * (b0 + b1) - t0 - t1 + t2.mul_by_nonresidue()
+        c2 = (a0 + a2) * (b0 + b2) - t0 - t2 + t1
+        return tuple.__new__(type(self), (c0, c1, c2))
+
+    def square(self) -> Fq6:
+        # Chung-Hasan SQR2, 2 Fq2 squarings and 3 multiplications
+        a0, a1, a2 = self
+        s0 = a0.square()
+        ab = a0 * a1
+        s1 = ab + ab
+        s2 = (a0 - a1 + a2).square()
+        bc = a1 * a2
+        s3 = bc + bc
+        s4 = a2.square()
+        c0 = s3.mul_by_nonresidue() + s0
+        c1 = s4.mul_by_nonresidue() + s1
+        c2 = s1 + s2 + s3 - s0 - s4
+        return tuple.__new__(type(self), (c0, c1, c2))
+
+    def mul_by_12(self, b1: Fq2, b2: Fq2) -> Fq6:
+        # multiply by b1 v + b2 v^2, 5 Fq2 multiplications
+        a0, a1, a2 = self
+        t1 = a1 * b1
+        t2 = a2 * b2
+        c0 = ((a1 + a2) * (b1 + b2) - t1 - t2).mul_by_nonresidue()
+        c1 = a0 * b1 + t2.mul_by_nonresidue()
+        c2 = a0 * b2 + t1
+        return tuple.__new__(type(self), (c0, c1, c2))
+
+    def mul_by_fq2(self, b: Fq2) -> Fq6:
+        a0, a1, a2 = self
+        return tuple.__new__(type(self), (a0 * b, a1 * b, a2 * b))
 
 
 class Fq12(FieldExtBase):
     # Fq12 is constructed as Fq6(w) / (w2 - γ) where γ = v
+    __slots__ = ()
+    _per_q = {}
     extension = 12
     embedding = 2
     basefield = Fq6
 
-    def __init__(self, Q, *args):
-        super().set_root(Fq6(Q, Fq2.zero(Q), Fq2.one(Q), Fq2.zero(Q)))
-
     def __invert__(self) -> Fq12:
         a, b = self
         factor = ~(a * a - (b * b).mul_by_nonresidue())
         return Fq12(self.Q, a * factor, -b * factor)
 
+    def __mul__(self, other):
+        # Karatsuba, 3 Fq6 multiplications
+        if type(other) is not type(self):
+            return FieldExtBase.__mul__(self, other)
+        a0, a1 = self
+        b0, b1 = other
+        t0 = a0 * b0
+        t1 = a1 * b1
+        c0 = t0 + t1.mul_by_nonresidue()
+        c1 = (a0 + a1) * (b0 + b1) - t0 - t1
+        return tuple.__new__(type(self), (c0, c1))
+
+    def square(self) -> Fq12:
+        # complex squaring, 2 Fq6 multiplications
+        a0, a1 = self
+        t = a0 * a1
+        c0 = (a0 + a1) * (a0 + a1.mul_by_nonresidue()) - t - t.mul_by_nonresidue()
+        return tuple.__new__(type(self), (c0, t + t))
+
+    def mul_by_line(self, l0: Fq2, l3: Fq2, l5: Fq2) -> Fq12:
+        # multiply by the sparse l0 + l3 w^3 + l5 w^5 = (l0, 0, 0) + (0, l3, l5) w
+        # produced by the Miller loop lines, 14 Fq2 multiplications
+        a0, a1 = self
+        t0 = a0.mul_by_fq2(l0)
+        t1 = a1.mul_by_12(l3, l5)
+        c0 = t0 + t1.mul_by_nonresidue()
+        c1 = (a0 + a1) * tuple.__new__(type(a0), (l0, l3, l5)) - t0 - t1
+        return tuple.__new__(type(self), (c0, c1))
+
+    def conjugate(self) -> Fq12:
+        # a0 - a1 w, the q^6-th power; the inverse in the cyclotomic subgroup
+        a0, a1 = self
+        return tuple.__new__(type(self), (a0, -a1))
+
+    def cyclotomic_square(self) -> Fq12:
+        """
+        Granger-Scott squaring, only valid for elements of the cyclotomic
+        subgroup (norm 1 over Fq6, e.g. after the easy part of the final
+        exponentiation).  Three Fq4 squarings, 6 Fq2 squarings in total.
+        https://eprint.iacr.org/2009/565.pdf
+        """
+        (z0, z4, z3), (z2, z1, z5) = self
+
+        def fq4_square(a, b):
+            t0 = a.square()
+            t1 = b.square()
+            return t0 + t1.mul_by_nonresidue(), (a + b).square() - t0 - t1
+
+        t0, t1 = fq4_square(z0, z1)
+        z0 = t0 - z0
+        z0 = z0 + z0 + t0
+        z1 = t1 + z1
+        z1 = z1 + z1 + t1
+
+        t0, t1 = fq4_square(z2, z3)
+        t2, t3 = fq4_square(z4, z5)
+        z4 = t0 - z4
+        z4 = z4 + z4 + t0
+        z5 = t1 + z5
+        z5 = z5 + z5 + t1
+
+        t0 = t3.mul_by_nonresidue()
+        z2 = t0 + z2
+        z2 = z2 + z2 + t0
+        z3 = t2 - z3
+        z3 = z3 + z3 + t2
+
+        fq6 = type(self[0])
+        return tuple.__new__(
+            type(self), (tuple.__new__(fq6, (z0, z4, z3)), tuple.__new__(fq6, (z2, z1, z5)))
+        )
+
+    def cyclotomic_exp(self, e: int) -> Fq12:
+        """
+        self ** e with cyclotomic squarings, self must be in the cyclotomic
+        subgroup.  Negative exponents use the conjugate.
+        """
+        if e < 0:
+            return self.cyclotomic_exp(-e).conjugate()
+        ans = self.one(self.Q)
+        for i in reversed(range(e.bit_length())):
+            ans = ans.cyclotomic_square()
+            if (e >> i) & 1:
+                ans = ans * self
+        return ans
+
+
+Fq._generic = Fq
+Fq2._generic = Fq2
+Fq6._generic = Fq6
+Fq12._generic = Fq12
+
+
+def field_class(x):
+    """
+    Generic class (Fq, Fq2, Fq6 or Fq12) of a field element; type(x) is
+    the per-modulus subclass.
+    """
+    return x._generic
+
 
 # Because fields aren't done with metaclasses, and we need to
 # avoid circular imports, we put a hack here for bls12381 for now.
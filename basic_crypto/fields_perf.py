@@ -0,0 +1,66 @@
+import random
+import time
+import tracemalloc
+
+from ec import G1Generator, G2Generator, default_ec
+from fields import Fq, Fq2, Fq6, Fq12
+from pairing import ate_pairing
+
+q = default_ec.q
+
+
+def rand_fq():
+    return Fq(q, random.randint(0, q - 1))
+
+
+def rand_fq2():
+    return Fq2(q, rand_fq(), rand_fq())
+
+
+def rand_fq6():
+    return Fq6(q, rand_fq2(), rand_fq2(), rand_fq2())
+
+
+def rand_fq12():
+    return Fq12(q, rand_fq6(), rand_fq6())
+
+
+# average bytes allocated per element, including its coefficients
+def bytes_per_element(make, n=2000):
+    # create the per-field caches outside of the measurement
+    make()
+    tracemalloc.start()
+    objs = [make() for i in range(n)]
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del objs
+    return current / n
+
+
+def ops_per_sec(op, a, b, n):
+    start_time = time.time()
+    for i in range(n):
+        op(a, b)
+    return n / (time.time() - start_time)
+
+
+if __name__ == "__main__":
+    for name, make in [("Fq", rand_fq), ("Fq2", rand_fq2), ("Fq6", rand_fq6), ("Fq12", rand_fq12)]:
+        print("%s: %.0f bytes per element" % (name, bytes_per_element(make)))
+
+    add = lambda x, y: x + y
+    mul = lambda x, y: x * y
+    a, b = rand_fq(), rand_fq()
+    print("Fq add: %.0f ops/s" % ops_per_sec(add, a, b, 200000))
+    print("Fq mul: %.0f ops/s" % ops_per_sec(mul, a, b, 200000))
+    a, b = rand_fq2(), rand_fq2()
+    print("Fq2 mul: %.0f ops/s" % ops_per_sec(mul, a, b, 20000))
+    a, b = rand_fq6(), rand_fq6()
+    print("Fq6 mul: %.0f ops/s" % ops_per_sec(mul, a, b, 2000))
+    a, b = rand_fq12(), rand_fq12()
+    print("Fq12 mul: %.0f ops/s" % ops_per_sec(mul, a, b, 500))
+
+    P, Q = G1Generator(), G2Generator()
+    start_time = time.time()
+    ate_pairing(P, Q)
+    print("ate_pairing: %.3f s" % (time.time() - start_time))
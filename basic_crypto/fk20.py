@@ -0,0 +1,166 @@
+# Amortised KZG proofs (Feist-Khovratovich, https://eprint.iacr.org/2023/033)
+#
+# For a coset z * H with H the subgroup of order l, the proof is the
+# commitment to q(X) = (f(X) - I(X)) / (X^l - a), a = z^l.  Writing
+# k = m*l + r, the quotient of X^k is X^r * sum_{t<m} X^(l*t) a^(m-1-t), so
+#   proof(a) = sum_e a^e h_e,
+#   h_e = sum_{r<l} sum_{j} f_{(e+1+j)*l + r} [s^(r + l*j)]
+# The h_e are l Toeplitz matrix-vector products, done as circulant
+# products with EC-FFTs, and the proofs of all the cosets w^i * H of a
+# domain of size N are then a single EC-FFT of h over the a_i = w^(i*l).
+# l = 1 gives the single point proofs of every point of the domain.
+
+import hashlib
+from collections import OrderedDict
+
+from ec import G1Infinity, default_ec, multi_scalar_mult, points_to_bytes
+from ec_fft import ec_fft
+from fft import fft
+
+MODULUS = default_ec.n
+# generator of the multiplicative group used for the roots of unity
+PRIMITIVE_ROOT = 7
+
+
+def _root_of_unity(order):
+    assert (MODULUS - 1) % order == 0
+    return pow(PRIMITIVE_ROOT, (MODULUS - 1) // order, MODULUS)
+
+
+def _next_power_of_2(x):
+    return 1 if x <= 1 else 1 << (x - 1).bit_length()
+
+
+class FK20Setup():
+    # The setup side of the Toeplitz products: for every residue r < l the
+    # EC-FFT of the (reversed, zero padded) points [s^(r + l*j)], which only
+    # depends on the setup, the polynomial length and l.
+    def __init__(self, setup, n, coset_size):
+        self.n = n
+        self.coset_size = l = coset_size
+        # number of h_e, the quotients have degree < n - l
+        self.L = _next_power_of_2((n + l - 1) // l)
+        self.root = _root_of_unity(2 * self.L)
+        zero = G1Infinity()
+        self.ffts = []
+        for r in range(l):
+            # reversed so that the correlation becomes a convolution
+            col = []
+            for k in range(self.L):
+                i = r + l * (self.L - 1 - k)
+                col.append(setup[i] if i < n else zero)
+            self.ffts.append(ec_fft(col + [zero] * self.L, MODULUS, self.root))
+
+    # h_e for e < L
+    def toeplitz(self, poly):
+        l, L = self.coset_size, self.L
+        poly = [c % MODULUS for c in poly]
+        # FFTs of the coefficient columns f_{m*l + r}
+        cols = []
+        for r in range(l):
+            col = poly[r::l][:L]
+            cols.append(fft(col + [0] * (2 * L - len(col)), MODULUS, self.root))
+        hat = [multi_scalar_mult([self.ffts[r][k] for r in range(l)], [cols[r][k] for r in range(l)])
+               for k in range(2 * L)]
+        # coefficient e + L of the product holds h_e
+        return ec_fft(hat, MODULUS, self.root, inv=True)[L:]
+
+
+# the last FK20_CACHE_SIZE FK20Setups, keyed by (digest of the first n
+# setup points, n, coset_size).  The points are hashed rather than the
+# list identity, so equal setups share an entry and nothing is pinned.
+FK20_CACHE_SIZE = 4
+_fk20_setups = OrderedDict()
+
+
+def get_fk20_setup(setup, n, coset_size):
+    key = (hashlib.sha256(b"".join(points_to_bytes(setup[:n]))).digest(), n, coset_size)
+    s = _fk20_setups.get(key)
+    if s is None:
+        s = FK20Setup(setup, n, coset_size)
+        _fk20_setups[key] = s
+        if len(_fk20_setups) > FK20_CACHE_SIZE:
+            _fk20_setups.popitem(last=False)
+    else:
+        _fk20_setups.move_to_end(key)
+    return s
+
+
+def compute_all_proofs(poly, setup, coset_size, domain_size=None):
+    # Proofs of all the cosets w^i * H, i < domain_size / coset_size, of the
+    # domain of w = root of unity of order domain_size (default: twice the
+    # polynomial length, i.e. an extended blob), H = <w^(domain_size / coset_size)>.
+    # Proof i opens poly at w^i * H and verifies with the divisor
+    # X^coset_size - w^(i * coset_size).
+    # setup is the list of [s^i] in G1 (PolyCommitment.getSetupVector1).
+    n = len(poly)
+    if domain_size is None:
+        domain_size = 2 * _next_power_of_2(n)
+    assert domain_size % coset_size == 0 and len(setup) >= n
+    ncosets = domain_size // coset_size
+    fs = get_fk20_setup(setup, n, coset_size)
+    h = fs.toeplitz(poly)
+    assert len(h) <= ncosets, "domain too small for the polynomial"
+    return ec_fft(h, MODULUS, _root_of_unity(ncosets))
+
+
+def test_single_proofs():
+    import random
+    from poly_commit import PolyCommitment
+
+    pc = PolyCommitment()
+    n = 8
+    poly = [random.randint(0, MODULUS - 1) for i in range(n)]
+    setup = pc.getSetupVector1(n)
+    proofs = compute_all_proofs(poly, setup, 1)
+    w = _root_of_unity(2 * n)
+    commit = pc.getCommitmentByCoeffs(poly)
+    for i, proof in enumerate(proofs):
+        x = pow(w, i, MODULUS)
+        y = pc.pf.eval_poly_at(poly, x)
+        assert proof == pc.getSingleProofAt(poly, x, y)
+        assert pc.verifySingleProof(commit, proof, x, y)
+    print("test_single_proofs passed")
+
+
+def test_coset_proofs():
+    import random
+    from poly_commit import PolyCommitment
+
+    pc = PolyCommitment()
+    n = 16
+    poly = [random.randint(0, MODULUS - 1) for i in range(n)]
+    setup = pc.getSetupVector1(n)
+    for l in [2, 4]:
+        proofs = compute_all_proofs(poly, setup, l)
+        w = _root_of_unity(2 * n)
+        for i, proof in enumerate(proofs):
+            # quotient by X^l - w^(i*l)
+            div = [-pow(w, i * l, MODULUS) % MODULUS] + [0] * (l - 1) + [1]
+            q = pc.pf.div_polys(poly, div)
+            assert proof == pc.getCommitmentByCoeffs(q)
+    print("test_coset_proofs passed")
+
+
+def test_fk20_cache():
+    import random
+    from poly_commit import PolyCommitment
+
+    pc = PolyCommitment()
+    n = 8
+    poly = [random.randint(0, MODULUS - 1) for i in range(n)]
+    _fk20_setups.clear()
+    proofs = compute_all_proofs(poly, pc.getSetupVector1(n), 1)
+    # a new list with the same points reuses the entry
+    assert compute_all_proofs(poly, list(pc.getSetupVector1(n)), 1) == proofs
+    assert len(_fk20_setups) == 1
+    for i in range(FK20_CACHE_SIZE + 2):
+        compute_all_proofs(poly[: n // 2], PolyCommitment().getSetupVector1(n // 2), 1)
+    assert len(_fk20_setups) == FK20_CACHE_SIZE
+    print("test_fk20_cache passed")
+
+
+if __name__ == "__main__":
+    test_single_proofs()
+    test_coset_proofs()
+    test_fk20_cache()
@@ -2,8 +2,8 @@ from collections import namedtuple
 from typing import List
 
 import bls12381
-from ec import AffinePoint, JacobianPoint, untwist
-from fields import Fq, Fq12
+from ec import AffinePoint, JacobianPoint, batch_to_affine, untwist
+from fields import Fq, Fq2, Fq6, Fq12
 
 # Struct for elliptic curve parameters
 EC = namedtuple("EC", "q a b gx gy g2x g2y n h x k sqrt_n3 sqrt_n3m1o2")
@@ -56,27 +56,136 @@ def add_line_eval(R: AffinePoint, Q: AffinePoint, P: AffinePoint, ec=default_ec)
     return P.y - P.x * slope - v
 
 
+class G2Prepared:
+    """
+    Line coefficients of the Miller loop for a fixed point Q on the twist,
+    so that pairings with the same Q (G2Generator(), G2 * secret in a KZG
+    setup, ...) only walk the doubling chain of Q once.
+
+    R runs in homogeneous projective coordinates (x = X/Z, y = Y/Z), so no
+    inversion is needed.  A line y - slope * x - v through points of the
+    twist becomes, on the untwisted curve and multiplied by ξ = u + 1 (with
+    w^6 = ξ), the sparse ξ * P.y - v * w^3 - P.x * slope * w^5.  With
+    slope = N / D every line is stored scaled by D as
+        (c0, c1, c2) = (ξ * D, -D * v, -N)
+    and evaluated at P as (c0 * P.y, c1, c2 * P.x) for Fq12.mul_by_line.
+    The Fq2 factors ξ and D are removed by the final exponentiation.
+    """
+
+    def __init__(self, Q, ec=default_ec, T=None):
+        if isinstance(Q, JacobianPoint):
+            Q = Q.to_affine()
+        self.infinity = Q.infinity
+        self.T = abs(ec.x) if T is None else T
+        # per bit of T after the first: (doubling line, addition line or None)
+        self.lines = []
+        if self.infinity:
+            return
+        x2, y2 = Q.x, Q.y
+        # twist coefficient b' = y^2 - x^3 (the twist has a = 0)
+        b = y2.square() - x2.square() * x2
+        b3 = b + b + b
+        half = ~Fq(ec.q, 2)
+        X, Y, Z = x2, y2, Fq2.one(ec.q)
+        for bit in int_to_bits(self.T)[1:]:
+            # doubling: slope 3X^2 / 2YZ, D * v = 3b'Z^2 - Y^2
+            B = Y.square()
+            C = Z.square()
+            E = b3 * C
+            F = E + E + E
+            H = (Y + Z).square() - B - C
+            XX = X.square()
+            dbl = (H.mul_by_nonresidue(), B - E, -(XX + XX + XX))
+            G = (B + F) * half
+            EE = E.square()
+            X, Y, Z = X * Y * half * (B - F), G.square() - EE - EE - EE, B * H
+            add = None
+            if bit == 1:
+                # mixed addition with Q: slope θ / λ, D * v = λ y2 - θ x2
+                theta = Y - y2 * Z
+                lam = X - x2 * Z
+                if lam == Fq2.zero(ec.q):
+                    # vertical line, see vertical_line
+                    add = (None, x2, None)
+                else:
+                    add = (lam.mul_by_nonresidue(), theta * x2 - lam * y2, -theta)
+                    D = lam.square()
+                    E = lam * D
+                    F = Z * theta.square()
+                    G = X * D
+                    H = E + F - G - G
+                    X, Y, Z = lam * H, theta * (G - H) - Y * E, Z * E
+            self.lines.append((dbl, add))
+
+
+def vertical_line(x2, P: AffinePoint) -> Fq12:
+    """
+    The vertical line x - x2 through Q = (x2, y2) on the twist evaluated at
+    P, that is P.x - x2 * w^-2, scaled by w^2 = v which lies in Fq6 and is
+    removed by the final exponentiation.
+    """
+    Q = x2.Q
+    return Fq12(Q, Fq6(Q, -x2, Fq2(Q, P.x, Fq(Q, 0)), Fq2.zero(Q)), Fq6.zero(Q))
+
+
+def _mul_line(f: Fq12, c, P: AffinePoint) -> Fq12:
+    c0, c1, c2 = c
+    if c0 is None:
+        return f * vertical_line(c1, P)
+    y, x = P.y.value, P.x.value
+    return f.mul_by_line(
+        c0._new(c0[0].value * y, c0[1].value * y),
+        c1,
+        c2._new(c2[0].value * x, c2[1].value * x),
+    )
+
+
+def miller_loop_prepared(P: AffinePoint, Qp: G2Prepared, ec=default_ec) -> Fq12:
+    """
+    Miller loop of the ate pairing with the line coefficients of Q taken
+    from Qp, only the evaluations at P and the Fq12 arithmetic remain.
+    """
+    f = Fq12.one(ec.q)
+    if P.infinity or Qp.infinity:
+        return f
+    for dbl, add in Qp.lines:
+        f = _mul_line(f.square(), dbl, P)
+        if add is not None:
+            f = _mul_line(f, add, P)
+    return f
+
+
+def miller_loop_multi(Ps: List[AffinePoint], Qps: List[G2Prepared], ec=default_ec) -> Fq12:
+    """
+    Product of the Miller loops of all (P, Q) pairs as one interleaved
+    loop: the accumulator is squared once per bit for all the pairs and
+    only the line multiplications are per pair.
+    """
+    f = Fq12.one(ec.q)
+    pairs = [(P, Qp) for P, Qp in zip(Ps, Qps) if not P.infinity and not Qp.infinity]
+    if len(pairs) == 0:
+        return f
+    assert all(Qp.T == pairs[0][1].T for _, Qp in pairs)
+    for i in range(len(pairs[0][1].lines)):
+        f = f.square()
+        for P, Qp in pairs:
+            dbl, add = Qp.lines[i]
+            f = _mul_line(f, dbl, P)
+            if add is not None:
+                f = _mul_line(f, add, P)
+    return f
+
+
 def miller_loop(T: int, P: AffinePoint, Q: AffinePoint, ec=default_ec) -> Fq12:
     """
     Performs a double and add algorithm for the ate pairing. This algorithm
     is taken from Craig Costello's "Pairing for Beginners".
+    R is kept on the twist in projective coordinates and the lines are
+    multiplied in sparse form (see G2Prepared), so the result matches the
+    untwisted affine loop up to an Fq6 factor that the final exponentiation
+    removes.
     """
-    T_bits = int_to_bits(T)
-    R = Q
-    f = Fq12.one(ec.q)  # f is an element of Fq12
-    for i in range(1, len(T_bits)):
-        # Compute sloped line lrr
-        lrr = double_line_eval(R, P, ec)
-        f = f * f * lrr
-
-        R = Fq(ec.q, 2) * R
-        if T_bits[i] == 1:
-            # Compute sloped line lrq
-            lrq = add_line_eval(R, Q, P, ec)
-            f = f * lrq
-
-            R = R + Q
-    return f
+    return miller_loop_prepared(P, G2Prepared(Q, ec, T), ec)
 
 
 def final_exponentiation(element: Fq12, ec=default_ec) -> Fq12:
@@ -84,7 +193,12 @@ def final_exponentiation(element: Fq12, ec=default_ec) -> Fq12:
     Performs a final exponentiation to map the result of the Miller
     loop to a unique element of Fq12.
     """
-    if ec.k == 12:
+    if ec.k == 12 and ec.q == bls12381.q:
+        # easy part, f^((q^6 - 1)(q^2 + 1)), lands in the cyclotomic subgroup
+        ans = element.conjugate() / element
+        ans = ans.qi_power(2) * ans
+        return final_exponentiation_hard(ans, ec)
+    elif ec.k == 12:
         ans = element ** ((pow(ec.q, 4) - pow(ec.q, 2) + 1) // ec.n)
         ans = ans.qi_power(2) * ans
         ans = ans.qi_power(6) / ans
@@ -93,13 +207,30 @@ def final_exponentiation(element: Fq12, ec=default_ec) -> Fq12:
         return element ** ((pow(ec.q, ec.k) - 1) // ec.n)
 
 
+def final_exponentiation_hard(f: Fq12, ec=default_ec) -> Fq12:
+    """
+    Raises f in the cyclotomic subgroup to (q^4 - q^2 + 1) / n for BLS12
+    curves, writing the exponent as l0 + l1 q + l2 q^2 + l3 q^3 with
+        l3 = (x - 1)^2 / 3, l2 = l3 x, l1 = l2 x - l3, l0 = l1 x + 1
+    so that only exponentiations by x (and one by l3) are needed, with
+    cyclotomic squarings, and the q^i powers are Frobenius maps.  This is
+    exactly the hard part exponent, not a multiple of it.
+    """
+    x = ec.x
+    a3 = f.cyclotomic_exp((x - 1) ** 2 // 3)
+    a2 = a3.cyclotomic_exp(x)
+    a1 = a2.cyclotomic_exp(x) * a3.conjugate()
+    a0 = a1.cyclotomic_exp(x) * f
+    return a0 * a1.qi_power(1) * a2.qi_power(2) * a3.qi_power(3)
+
+
 def ate_pairing(P: JacobianPoint, Q: JacobianPoint, ec=default_ec) -> Fq12:
     """
-    Performs one ate pairing.
+    Performs one ate pairing. Q can be a G2Prepared.
     """
-    t = default_ec.x + 1
-    T = abs(t - 1)
-    element = miller_loop(T, P.to_affine(), Q.to_affine(), ec)
+    if not isinstance(Q, G2Prepared):
+        Q = G2Prepared(Q, ec)
+    element = miller_loop_prepared(P.to_affine(), Q, ec)
     return final_exponentiation(element, ec)
 
 
@@ -109,14 +240,32 @@ def ate_pairing_multi(
     """
     Computes multiple pairings at once. This is more efficient,
     since we can multiply all the results of the miller loops,
-    and perform just one final exponentiation.
-    """
-    t = default_ec.x + 1
-    T = abs(t - 1)
-    prod = Fq12.one(ec.q)
-    for i in range(len(Qs)):
-        prod *= miller_loop(T, Ps[i].to_affine(), Qs[i].to_affine(), ec)
-    return final_exponentiation(prod, ec)
+    and perform just one final exponentiation. Qs can be G2Prepared.
+    """
+    Ps, Qps = _prepare_pairs(Ps, Qs, ec)
+    return final_exponentiation(miller_loop_multi(Ps, Qps, ec), ec)
+
+
+def _prepare_pairs(Ps, Qs, ec):
+    # affine G1 points and G2Prepared, one inversion for the affine
+    # conversions of each group
+    Ps = batch_to_affine(Ps)
+    Qs = list(Qs)
+    raw = [i for i in range(len(Qs)) if not isinstance(Qs[i], G2Prepared)]
+    for i, Q in zip(raw, batch_to_affine([Qs[i] for i in raw])):
+        Qs[i] = G2Prepared(Q, ec)
+    return Ps, Qs
+
+
+def pairing_product_is_one(pairs, ec=default_ec) -> bool:
+    """
+    Checks prod e(P_i, Q_i) == 1 for pairs of (G1 point, G2 point or
+    G2Prepared), with a single interleaved Miller loop and one final
+    exponentiation.  e(A, B) == e(C, D) is pairing_product_is_one(
+    [(A, B), (C.negate(), D)]).
+    """
+    Ps, Qps = _prepare_pairs([P for P, _ in pairs], [Q for _, Q in pairs], ec)
+    return final_exponentiation(miller_loop_multi(Ps, Qps, ec), ec) == Fq12.one(ec.q)
 
 
 """
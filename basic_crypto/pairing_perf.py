@@ -0,0 +1,61 @@
+import random
+import time
+
+from ec import G1Generator, G2Generator, default_ec
+from fields_perf import rand_fq12
+from pairing import G2Prepared, ate_pairing, final_exponentiation, miller_loop
+
+q, n = default_ec.q, default_ec.n
+
+
+# final exponentiation with generic Fq12 powers, the reference result
+def final_exponentiation_generic(element):
+    ans = element ** ((pow(q, 4) - pow(q, 2) + 1) // n)
+    ans = ans.qi_power(2) * ans
+    ans = ans.qi_power(6) / ans
+    return ans
+
+
+def timed(f, *args):
+    start_time = time.time()
+    r = f(*args)
+    return r, time.time() - start_time
+
+
+def test_cyclotomic_square():
+    f = rand_fq12()
+    f = f.conjugate() / f
+    f = f.qi_power(2) * f
+    assert f.cyclotomic_square() == f.square()
+    assert f.cyclotomic_exp(12345) == f ** 12345
+    assert f.cyclotomic_exp(-7) == ~(f ** 7)
+    print("test_cyclotomic_square passed")
+
+
+def test_final_exponentiation():
+    for i in range(3):
+        f = rand_fq12()
+        assert final_exponentiation(f) == final_exponentiation_generic(f)
+    print("test_final_exponentiation passed")
+
+
+if __name__ == "__main__":
+    test_cyclotomic_square()
+    test_final_exponentiation()
+
+    P = G1Generator() * random.randint(1, n - 1)
+    Q = G2Generator() * random.randint(1, n - 1)
+    T = abs(default_ec.x)
+    f, t = timed(miller_loop, T, P.to_affine(), Q.to_affine())
+    print("miller_loop: %.3f s" % t)
+    e0, t0 = timed(final_exponentiation_generic, f)
+    print("final_exponentiation (generic pow): %.3f s" % t0)
+    e1, t1 = timed(final_exponentiation, f)
+    print("final_exponentiation (cyclotomic): %.3f s" % t1)
+    assert e0 == e1
+    _, t = timed(ate_pairing, P, Q)
+    print("ate_pairing: %.3f s" % t)
+    Qp, t = timed(G2Prepared, Q)
+    print("G2Prepared: %.3f s" % t)
+    _, t = timed(ate_pairing, P, Qp)
+    print("ate_pairing (prepared G2): %.3f s" % t)
@@ -4,63 +4,94 @@ import random
 import hashlib
 
 from fft import fft
-from ec import (G1Generator, G2Generator, default_ec)
+from ec import (G1Generator, G2Generator, JacobianPoint, default_ec,
+                fixed_base_mul, fixed_base_mul_many, multi_scalar_mult,
+                points_to_bytes)
+from ec_fft import lagrange_setup
 from poly_utils import PrimeField
-from pairing import ate_pairing
+from pairing import G2Prepared, pairing_product_is_one
 
 class PolyCommitment:
     def __init__(self, setup=None):
-        assert setup == None
+        # setup - None for a random secret, or an SRS (srs.load_srs) whose
+        # points are used as they are, with the secret unknown
         self.modulus = default_ec.n
         self.pf = PrimeField(self.modulus)  # order of Elliptic curve
+        self.G1 = G1Generator()
+        self.G2 = G2Generator()
+        self.prepared_g2 = None
+        self.lagrange_setups = {}
+        self.srs = setup
         if setup == None:
             self.secret = random.randint(0, self.pf.modulus - 1)
-            self.G1 = G1Generator()
-            self.G2 = G2Generator()
             self.setup_vec1 = []
             self.setup_vec2 = []
         else:
-            assert False
+            self.secret = None
+            self.setup_vec1 = setup.g1
+            self.setup_vec2 = setup.g2
+
+    # s^i for i in [start, end)
+    def secretPowers(self, start, end):
+        return [pow(self.secret, i, self.modulus) for i in range(start, end)]
 
     def getSetupVector1(self, length):
-        for i in range(len(self.setup_vec1), length):
-            self.setup_vec1.append(self.G1 * (self.secret ** i))
+        # G1, G2 are the generators, so the fixed-base tables apply
+        if length > len(self.setup_vec1):
+            assert self.srs is None, "SRS too short"
+            self.setup_vec1 += fixed_base_mul_many(self.secretPowers(len(self.setup_vec1), length))
         return self.setup_vec1[0:length]
 
     def getSetupVector2(self, length):
-        for i in range(len(self.setup_vec2), length):
-            self.setup_vec2.append(self.G2 * (self.secret ** i))
+        if length > len(self.setup_vec2):
+            assert self.srs is None, "SRS too short"
+            self.setup_vec2 += fixed_base_mul_many(self.secretPowers(len(self.setup_vec2), length), g2=True)
         return self.setup_vec2[0:length]
 
+    # Miller loop line coefficients of [1] and [s] in G2, computed once
+    # and shared by all the verifier pairings
+    def getPreparedG2(self):
+        if self.prepared_g2 is None:
+            self.prepared_g2 = (G2Prepared(self.G2), G2Prepared(self.getSetupVector2(2)[1]))
+        return self.prepared_g2
+
+    # [L_i(s)] in G1 for the domain shift * g^i, g of order length
+    # (default the 7-based root of unity), derived from the coefficient
+    # setup with an EC-FFT (or read from the SRS) and cached per domain
+    def getLagrangeSetup1(self, length, g=None, shift=1):
+        if g is None:
+            g = self.pf.exp(7, (self.pf.modulus-1) // length)
+        key = (length, g, shift)
+        if key not in self.lagrange_setups and self.srs is not None:
+            self.lagrange_setups[key] = self.srs.lagrange(length, g, shift)
+        if self.lagrange_setups.get(key) is None:
+            self.lagrange_setups[key] = lagrange_setup(self.getSetupVector1(length), self.modulus, g, shift)
+        return self.lagrange_setups[key]
+
     def toPointSetup1(self, length):
         # convert KZG coefficient setup to point-evaluation setup
         assert (length - 1) & length == 0
-        poly = [self.modulus - 1] + [0] * (length - 1) + [1]
-        g = self.pf.exp(7, (self.pf.modulus-1) // length)
-        psetup = []
-        csetup = self.getSetupVector1(length)
-        for i in range(length):
-            # L_i(x) = \frac{\omega_i(x^N - 1) }{N (x - \omega_i)}
-            ppoly, rem = self.pf.div_polys_with_rem(poly, self.pf.mul_by_const([self.modulus - pow(g, i, self.modulus), 1], self.pf.inv(pow(g, i, self.modulus)) * length))
-            assert rem == [0]
-            p = sum(p * c for p, c in zip(ppoly, csetup))
-            psetup.append(p)
-        return psetup
+        return self.getLagrangeSetup1(length)
 
     # get the commitment of a polynomial in evaluation form
     # return a curve point
     def getCommitment(self, evals, g):
         # g - roots of unity
-        coeffs = fft(evals, self.pf.modulus, g, inv=True)
-        sv = self.getSetupVector1(len(coeffs))
-        return sum(s * c for s, c in zip(sv, coeffs))
+        # with the Lagrange setup of the domain of g, no inverse FFT per
+        # commitment; missing evals are zeros, as with the inverse FFT
+        n, x = 1, g % self.modulus
+        while x != 1:
+            n, x = n + 1, x * g % self.modulus
+        assert len(evals) <= n
+        evals = list(evals) + [0] * (n - len(evals))
+        return multi_scalar_mult(self.getLagrangeSetup1(n, g), evals)
     
     # get the commitment of a polynomial in evaluation form
     # return a curve point
     def getCommitmentByCoeffs(self, coeffs):
         # g - roots of unity
         sv = self.getSetupVector1(len(coeffs))
-        return sum(s * c for s, c in zip(sv, coeffs))
+        return multi_scalar_mult(sv, coeffs)
 
     def getSingleProofByEvalIdx(self, evals, g, idx):
         # g - primitive root of unity
@@ -75,39 +106,67 @@ class PolyCommitment:
     def getSingleProofAt(self, coeffs, x0, y0):
         coeffs = coeffs[:]
         coeffs[0] = coeffs[0] - y0
-        qx = self.pf.div_polys(coeffs, [self.modulus-x0, 1])
+        qx = self.pf.div_by_linear(coeffs, x0)
         sv = self.getSetupVector1(len(qx))
-        return sum(s * c for s, c in zip(sv, qx))
+        return multi_scalar_mult(sv, qx)
 
     def verifySingleProof(self, commit, proof, x0, y0):
         # verify using
         # e(c - [y0], [1]) = e(proof, [tau - x0])
-        sz2 = self.G2 * self.secret + (self.G2 * x0).negate()
-        pair0 = ate_pairing(proof, sz2)
-
-        cy = commit + (self.G1 * y0).negate()
-        pair1 = ate_pairing(cy, self.G2)
-        return pair0 == pair1
+        # moving x0 to G1, e(c - [y0] + proof * x0, [1]) = e(proof, [tau]),
+        # so that both G2 points are fixed and prepared
+        g2, sg2 = self.getPreparedG2()
+        cy = commit + fixed_base_mul(y0).negate() + proof * x0
+        return pairing_product_is_one([(proof, sg2), (cy.negate(), g2)])
     
     def verifySingleProof2(self, commit, proof, x0, y0):
         # verify using
-        # e(c - [y0] + proof * x0, [1]), e(proof, [tau])
-        pair0 = ate_pairing(proof, self.G2 * self.secret)
-
-        cy = commit + (self.G1 * y0).negate() + proof * x0
-        pair1 = ate_pairing(cy, self.G2)
-        return pair0 == pair1
+        # e(c - [y0], [1]) = e(proof, [tau - x0]) with x0 on the G2 side,
+        # so [tau - x0] is prepared on every call
+        g2 = self.getPreparedG2()[0]
+        sz2 = self.getSetupVector2(2)[1] + fixed_base_mul(x0, g2=True).negate()
+        cy = commit + fixed_base_mul(y0).negate()
+        return pairing_product_is_one([(proof, sz2), (cy.negate(), g2)])
     
     def rand(self):
         return random.randint(0, self.modulus - 1)
 
 
 def ec_lincomb(points, vs):
-    # simple, inefficient linear combination
+    # linear combination, with Pippenger's MSM for curve points
+    if isinstance(points[0], JacobianPoint):
+        return multi_scalar_mult(points, vs)
     ps = [p * v for p, v in zip(points, vs)]
     return sum(ps[1:], start=ps[0])
 
 
+def verify_batch(pc, commitments, points, values, proofs):
+    # verify openings (commitments[i], points[i], values[i], proofs[i]) of
+    # pc at once.  Each one is
+    #   e(proof_i, [s]) = e(c_i - [y_i] + proof_i * x_i, [1])
+    # and with r_i = r^i for r derived from all the inputs (Fiat-Shamir) the
+    # random linear combination
+    #   e(sum r_i proof_i, [s]) = e(sum r_i (c_i + x_i proof_i) - [sum r_i y_i], [1])
+    # only holds if all of them hold (except with negligible probability).
+    # Two MSMs and two pairings instead of 2N pairings.
+    n = len(commitments)
+    assert len(points) == n and len(values) == n and len(proofs) == n
+    if n == 0:
+        return True
+    m = pc.modulus
+    data = b"".join(points_to_bytes(commitments + proofs))
+    for x, y in zip(points, values):
+        data += (x % m).to_bytes(32, byteorder="big") + (y % m).to_bytes(32, byteorder="big")
+    r = int.from_bytes(hashlib.sha256(data).digest(), byteorder="big") % m
+    rs = [pow(r, i, m) for i in range(n)]
+
+    lhs = multi_scalar_mult(proofs, rs)
+    rhs = multi_scalar_mult(commitments + proofs, rs + [ri * x % m for ri, x in zip(rs, points)])
+    rhs = rhs + fixed_base_mul(sum(ri * y for ri, y in zip(rs, values)) % m).negate()
+    g2, sg2 = pc.getPreparedG2()
+    return pairing_product_is_one([(lhs, sg2), (rhs.negate(), g2)])
+
+
 def test_poly_commitment():
     pc = PolyCommitment()
     G = pc.pf.exp(7, (pc.pf.modulus-1) // 4)
@@ -116,6 +175,10 @@ def test_poly_commitment():
     proof = pc.getSingleProofByEvalIdx(evals, G, 1) # w^1
     assert pc.verifySingleProof(commit, proof, G, 2346)
     assert pc.verifySingleProof2(commit, proof, G, 2346)
+    assert not pc.verifySingleProof2(commit, proof, G, 2347)
+    # fewer evals than the order of G are zero padded
+    coeffs = fft([235, 2346, 132213, 0], pc.modulus, G, inv=True)
+    assert pc.getCommitment([235, 2346, 132213], G) == pc.getCommitmentByCoeffs(coeffs)
     print("poly_commitment test passed")
 
 
@@ -244,6 +307,63 @@ def test_prod1_linearization():
     print("test_prod1_linearization passed")
 
 
+def test_verify_batch():
+    pc = PolyCommitment()
+    npoly = 8
+    commits, xs, ys, proofs = [], [], [], []
+    for i in range(npoly):
+        p = [pc.rand() for j in range(4)]
+        x = pc.rand()
+        y = pc.pf.eval_poly_at(p, x)
+        commits.append(pc.getCommitmentByCoeffs(p))
+        xs.append(x)
+        ys.append(y)
+        proofs.append(pc.getSingleProofAt(p, x, y))
+    assert verify_batch(pc, commits, xs, ys, proofs)
+    ys[3] = (ys[3] + 1) % pc.modulus
+    assert not verify_batch(pc, commits, xs, ys, proofs)
+    print("test_verify_batch passed")
+
+
+def test_msm_scalars():
+    # negative and unreduced scalars, as accepted by p * c
+    pc = PolyCommitment()
+    n = pc.modulus
+    a, b = pc.rand(), pc.rand()
+    sv = pc.getSetupVector1(3)
+    expected = sv[0] * -3 + sv[1] * (a * b % n) + sv[2] * (n - 1)
+    assert multi_scalar_mult(sv, [-3, a * b, -1]) == expected
+    assert ec_lincomb(sv, [-3, a * b + 5 * n, -1 - n]) == expected
+    assert pc.getCommitmentByCoeffs([-3, a * b, -1]) == expected
+    g2 = pc.getSetupVector2(2)
+    assert multi_scalar_mult(g2, [-a, b + n]) == g2[0] * (n - a) + g2[1] * b
+    print("test_msm_scalars passed")
+
+
+def test_fixed_base_cache():
+    import os
+    import tempfile
+    from ec import FixedBaseTable
+
+    g = G1Generator()
+    c = random.randint(0, default_ec.n - 1)
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "table.bin")
+        FixedBaseTable(g, 4, cache_path=path)
+        with open(path, "rb") as f:
+            data = f.read()
+        assert FixedBaseTable(g, 4, cache_path=path).mul(c) == g * c
+        # corrupted body, other window, other base: rebuilt, not trusted
+        with open(path, "wb") as f:
+            f.write(data[:-1] + bytes([data[-1] ^ 1]))
+        assert FixedBaseTable(g, 4, cache_path=path).mul(c) == g * c
+        with open(path, "rb") as f:
+            assert f.read() == data
+        assert FixedBaseTable(g, 5, cache_path=path).mul(c) == g * c
+        assert FixedBaseTable(g * 2, 5, cache_path=path).mul(c) == g * 2 * c
+    print("test_fixed_base_cache passed")
+
+
 def test_point_setup():
     pc = PolyCommitment()
     order = 16
@@ -261,8 +381,11 @@ def test_point_setup():
 
 
 if __name__ == "__main__":
+    test_msm_scalars()
+    test_fixed_base_cache()
     test_point_setup()
     test_poly_commitment()
     test_full_poly()
     test_prod1()
     test_prod1_linearization()
+    test_verify_batch()
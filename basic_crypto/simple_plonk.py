@@ -3,9 +3,10 @@
 
 import random
 
+from ec import fixed_base_mul
 from fft import fft
-from pairing import ate_pairing
-from poly_commit import PolyCommitment, ec_lincomb
+from pairing import pairing_product_is_one
+from poly_commit import PolyCommitment, ec_lincomb, verify_batch
 
 
 def test_batch():
@@ -42,9 +43,11 @@ def test_batch():
     yr = ec_lincomb(ys, rs)
     pr = ec_lincomb(qs, rs)
 
-    left = ate_pairing(cr + pxr + yr * pc.G1.negate(), pc.G2)
-    right = ate_pairing(pr, pc.G2 * pc.secret)
-    assert left == right
+    g2, sg2 = pc.getPreparedG2()
+    # e(cr + pxr - [yr], [1]) == e(pr, [s])
+    assert pairing_product_is_one([(cr + pxr + fixed_base_mul(yr).negate(), g2), (pr.negate(), sg2)])
+    # the same check for any number of openings, with r from Fiat-Shamir
+    assert verify_batch(pc, cs, xs, ys, qs)
     print("test_batch passd")
 
 
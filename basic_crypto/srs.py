@@ -0,0 +1,485 @@
+# On-disk structured reference string (KZG setup) store
+#
+# File layout (little endian):
+#   header   magic b"KZGSRS01", flags u32 (bit 0: compressed points),
+#            number of sections u32, sha256 of the rest of the file
+#   table    per section: kind u32, count u32, offset u64, root 32 bytes,
+#            shift 32 bytes (root and shift are only used by Lagrange
+#            sections, big endian, zero otherwise)
+#   sections count points of fixed size each, at offset
+# Section kinds are the powers [s^i] in G1 and G2 and the Lagrange basis
+# [L_i(s)] in G1 of the domain shift * root^i.
+# Compressed points are the 48/96 byte zcash encoding (decoding needs a
+# square root), uncompressed ones the affine x || y (96/192 bytes, 0x40
+# followed by zeros for the point at infinity).
+#
+# load_srs memory-maps the file and only decodes a point when it is first
+# accessed, so opening a large setup takes milliseconds.  On load the first
+# G1 and G2 points must be the generators, every decoded point is on the
+# curve and G2 points are in the subgroup.  load_srs(path, check=True) (or
+# srs.py info --verify) also checks, at the cost of a subgroup check per
+# G1 point and a few MSMs:
+#   - the sha256 of the file (it is not keyed, so this only catches
+#     corruption),
+#   - every G1 point is in the subgroup,
+#   - G1[i+1] = s G1[i] and G2[i+1] = s G2[i] for the s of G2[1], with
+#     pairings of random linear combinations of the powers,
+#   - every Lagrange section is lagrange_setup of the G1 powers, at a
+#     random linear combination.
+# The setup is written with
+#   python srs.py generate out.srs --g1 4096 --g2 2 --lagrange 4096
+# which computes the points in parallel chunks with the fixed-base tables.
+
+import argparse
+import hashlib
+import mmap
+import os
+import secrets
+import struct
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+
+from ec import (AffinePoint, G1FromBytes, G1Generator, G1Infinity, G2FromBytes,
+                G2Generator, G2Infinity, batch_to_affine, default_ec, default_ec_twist,
+                fixed_base_mul_many, fixed_base_table, in_subgroup, multi_scalar_mult,
+                point_to_bytes)
+from fft import fft
+from fields import Fq, Fq2
+from pairing import pairing_product_is_one
+
+MAGIC = b"KZGSRS01"
+HEADER = struct.Struct("<8sII32s")
+ENTRY = struct.Struct("<IIQ32s32s")
+FLAG_COMPRESSED = 1
+
+G1_POWERS = 0
+G2_POWERS = 1
+G1_LAGRANGE = 2
+
+MODULUS = default_ec.n
+# generator of the multiplicative group used for the roots of unity
+PRIMITIVE_ROOT = 7
+
+SRS_WORKERS = os.cpu_count() or 1
+
+
+def _is_g2(kind):
+    return kind == G2_POWERS
+
+
+def point_size(g2, compressed):
+    size = 96 if g2 else 48
+    return size if compressed else 2 * size
+
+
+def encode_points(points, compressed):
+    out = []
+    for p, a in zip(points, batch_to_affine(points)):
+        if compressed:
+            out.append(point_to_bytes(a, p.ec, p.FE))
+        elif a.infinity:
+            out.append(b"\x40" + bytes(point_size(p.FE == Fq2, False) - 1))
+        else:
+            out.append(bytes(a.x) + bytes(a.y))
+    return b"".join(out)
+
+
+def decode_point(buffer, g2, compressed):
+    if compressed:
+        p = G2FromBytes(buffer) if g2 else G1FromBytes(buffer)
+    elif buffer[0] & 0x40:
+        return G2Infinity() if g2 else G1Infinity()
+    else:
+        ec, FE = (default_ec_twist, Fq2) if g2 else (default_ec, Fq)
+        size = len(buffer) // 2
+        x = FE.from_bytes(buffer[:size], ec.q)
+        y = FE.from_bytes(buffer[size:], ec.q)
+        a = AffinePoint(x, y, False, ec)
+        if not a.is_on_curve():
+            raise ValueError("SRS point not on the curve")
+        p = a.to_jacobian()
+    # the scalar multiplications assume subgroup points.  G2 sections are
+    # short, so their points are checked here; G1 points by SRS.verify
+    if g2 and not in_subgroup(p):
+        raise ValueError("SRS point not in the subgroup")
+    return p
+
+
+def _powers(r, n):
+    o = [1]
+    for i in range(n - 1):
+        o.append(o[-1] * r % MODULUS)
+    return o
+
+
+def _check_subgroup_chunk(args):
+    data, g2, compressed = args
+    size = point_size(g2, compressed)
+    return all(in_subgroup(decode_point(data[i : i + size], g2, compressed))
+               for i in range(0, len(data), size))
+
+
+class PointSection:
+    """
+    Read-only sequence of the points of a section, decoded from the mapped
+    file on first access and then kept.  Slicing returns a list.
+    """
+
+    def __init__(self, buffer, offset, count, g2, compressed):
+        self.buffer = buffer
+        self.offset = offset
+        self.count = count
+        self.g2 = g2
+        self.compressed = compressed
+        self.size = point_size(g2, compressed)
+        self.points = [None] * count
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(self.count))]
+        if i < 0:
+            i += self.count
+        if not 0 <= i < self.count:
+            raise IndexError("SRS point index out of range")
+        if self.points[i] is None:
+            pos = self.offset + i * self.size
+            self.points[i] = decode_point(self.buffer[pos : pos + self.size], self.g2, self.compressed)
+        return self.points[i]
+
+    def __iter__(self):
+        for i in range(self.count):
+            yield self[i]
+
+
+class SRS:
+    """
+    A memory-mapped SRS file: g1 and g2 are the PointSections of the
+    powers of the secret, lagrange(size) the Lagrange basis of a domain
+    if the file has it.  PolyCommitment(setup=load_srs(path)) commits
+    and verifies with it.
+    """
+
+    def __init__(self, path, check=False):
+        with open(path, "rb") as f:
+            self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, flags, nsections, self.digest = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC:
+            raise ValueError("not an SRS file")
+        self.compressed = bool(flags & FLAG_COMPRESSED)
+        self.g1 = None
+        self.g2 = None
+        self.lagranges = {}
+        for i in range(nsections):
+            kind, count, offset, root, shift = ENTRY.unpack_from(self.mm, HEADER.size + i * ENTRY.size)
+            if offset + count * point_size(_is_g2(kind), self.compressed) > len(self.mm):
+                raise ValueError("truncated SRS file")
+            section = PointSection(self.mm, offset, count, _is_g2(kind), self.compressed)
+            if kind == G1_POWERS:
+                self.g1 = section
+            elif kind == G2_POWERS:
+                self.g2 = section
+            elif kind == G1_LAGRANGE:
+                key = (count, int.from_bytes(root, "big"), int.from_bytes(shift, "big"))
+                self.lagranges[key] = section
+            else:
+                raise ValueError("unknown SRS section %d" % kind)
+        if self.g1 is None or self.g2 is None:
+            raise ValueError("SRS without G1 or G2 powers")
+        if len(self.g1) > 0 and self.g1[0] != G1Generator():
+            raise ValueError("first G1 point of the SRS is not the generator")
+        if len(self.g2) > 0 and self.g2[0] != G2Generator():
+            raise ValueError("first G2 point of the SRS is not the generator")
+        if check:
+            self.verify()
+
+    def verify(self, workers=None, chunk=256):
+        # the checks of load_srs(path, check=True), see the top of the file
+        if hashlib.sha256(self.mm[HEADER.size :]).digest() != self.digest:
+            raise ValueError("SRS checksum mismatch")
+        self._check_g1_subgroup(workers, chunk)
+        g1, g2 = self.g1, self.g2
+        n = len(g1)
+        if n > 1 and len(g2) > 1:
+            # e(a, G2[0]) = e(b, G2[1]) for a = sum_{i < n-1} r^i G1[i+1] and
+            # b = sum_{i < n-1} r^i G1[i] = G1[0] + r (a - r^(n-2) G1[n-1])
+            r = secrets.randbelow(MODULUS)
+            rs = _powers(r, n - 1)
+            a = multi_scalar_mult(g1[1:], rs)
+            b = g1[0] + (a + (g1[n - 1] * rs[-1]).negate()) * r
+            if not pairing_product_is_one([(a, g2[0]), (b.negate(), g2[1])]):
+                raise ValueError("SRS G1 powers do not match the G2 powers")
+        if n > 1 and len(g2) > 2:
+            rs = _powers(secrets.randbelow(MODULUS), len(g2) - 1)
+            a = multi_scalar_mult(g2[1:], rs)
+            b = multi_scalar_mult(g2[:-1], rs)
+            if not pairing_product_is_one([(g1[0], a), (g1[1].negate(), b)]):
+                raise ValueError("SRS G2 powers are not powers of the secret")
+        for (size, root, shift), section in self.lagranges.items():
+            if size > n:
+                raise ValueError("SRS Lagrange section longer than the G1 powers")
+            # root is of order size, a power of 2
+            if size == 0 or size & (size - 1) or pow(root, size // 2, MODULUS) != (MODULUS - 1 if size > 1 else 1):
+                raise ValueError("SRS Lagrange section root is not of the section size")
+            # sum_i e_i [L_i(s)] = [p(s)] for p(X) = sum_j c_j X^j of degree
+            # < size with p(shift * root^i) = e_i, c_j = ifft(e)_j / shift^j
+            evals = _powers(secrets.randbelow(MODULUS), size)
+            coeffs = fft(evals, MODULUS, root, inv=True)
+            inv_shift = pow(shift, MODULUS - 2, MODULUS)
+            coeffs = [-c * pow(inv_shift, j, MODULUS) % MODULUS for j, c in enumerate(coeffs)]
+            if not multi_scalar_mult(section[:] + g1[:size], evals + coeffs).infinity:
+                raise ValueError("SRS Lagrange section does not match the G1 powers")
+
+    def _check_g1_subgroup(self, workers, chunk):
+        sections = [self.g1] + list(self.lagranges.values())
+        size = point_size(False, self.compressed)
+        chunks = [(self.mm[s.offset + i * size : s.offset + min(i + chunk, s.count) * size],
+                   False, self.compressed)
+                  for s in sections for i in range(0, s.count, chunk)]
+        workers = workers or SRS_WORKERS
+        if workers > 1 and len(chunks) > 1 and "fork" in get_all_start_methods():
+            with ProcessPoolExecutor(workers, mp_context=get_context("fork")) as pool:
+                ok = all(pool.map(_check_subgroup_chunk, chunks))
+        else:
+            ok = all(map(_check_subgroup_chunk, chunks))
+        if not ok:
+            raise ValueError("SRS point not in the subgroup")
+
+    def lagrange(self, size, root=None, shift=1):
+        # the Lagrange section of the domain shift * root^i, None if absent
+        if root is None:
+            root = _root_of_unity(size)
+        return self.lagranges.get((size, root % MODULUS, shift % MODULUS))
+
+    def close(self):
+        self.mm.close()
+
+
+def load_srs(path, check=False):
+    return SRS(path, check)
+
+
+def _root_of_unity(order):
+    assert (MODULUS - 1) % order == 0
+    return pow(PRIMITIVE_ROOT, (MODULUS - 1) // order, MODULUS)
+
+
+def lagrange_scalars(secret, size, root=None, shift=1):
+    # L_i(s) = w_i (s^n - h^n) / (n h^n (s - w_i)), w_i = h * root^i
+    if root is None:
+        root = _root_of_unity(size)
+    s = secret % MODULUS
+    hn = pow(shift, size, MODULUS)
+    zn = (pow(s, size, MODULUS) - hn) % MODULUS
+    ws = [shift * pow(root, i, MODULUS) % MODULUS for i in range(size)]
+    if zn == 0:
+        # s is in the domain
+        return [1 if w == s else 0 for w in ws]
+    c = zn * pow(size * hn, MODULUS - 2, MODULUS)
+    return [w * c * pow(s - w, MODULUS - 2, MODULUS) % MODULUS for w in ws]
+
+
+def _encode_chunk(args):
+    scalars, g2, compressed = args
+    return encode_points(fixed_base_mul_many(scalars, g2=g2), compressed)
+
+
+def generate_srs(path, secret, n_g1, n_g2, lagrange_sizes=(), compressed=False,
+                 workers=None, chunk=256):
+    # (kind, scalars, root, shift) per section
+    sections = [
+        (G1_POWERS, [pow(secret, i, MODULUS) for i in range(n_g1)], 0, 0),
+        (G2_POWERS, [pow(secret, i, MODULUS) for i in range(n_g2)], 0, 0),
+    ]
+    for size in lagrange_sizes:
+        root = _root_of_unity(size)
+        sections.append((G1_LAGRANGE, lagrange_scalars(secret, size, root), root, 1))
+
+    offset = HEADER.size + ENTRY.size * len(sections)
+    table = []
+    for kind, scalars, root, shift in sections:
+        table.append(ENTRY.pack(kind, len(scalars), offset, root.to_bytes(32, "big"), shift.to_bytes(32, "big")))
+        offset += len(scalars) * point_size(_is_g2(kind), compressed)
+
+    workers = workers or SRS_WORKERS
+    # built before forking, so that the workers share them
+    fixed_base_table()
+    fixed_base_table(g2=True)
+    pool = None
+    if workers > 1 and "fork" in get_all_start_methods():
+        pool = ProcessPoolExecutor(workers, mp_context=get_context("fork"))
+    try:
+        with open(path, "wb") as f:
+            # the header is written again with the digest at the end
+            f.write(bytes(HEADER.size))
+            digest = hashlib.sha256(b"".join(table))
+            f.write(b"".join(table))
+            for kind, scalars, _, _ in sections:
+                chunks = [(scalars[i : i + chunk], _is_g2(kind), compressed)
+                          for i in range(0, len(scalars), chunk)]
+                for data in (pool.map(_encode_chunk, chunks) if pool else map(_encode_chunk, chunks)):
+                    digest.update(data)
+                    f.write(data)
+            f.seek(0)
+            f.write(HEADER.pack(MAGIC, FLAG_COMPRESSED if compressed else 0, len(sections), digest.digest()))
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+def test_srs_file():
+    import tempfile
+    from ec import fixed_base_mul
+    from ec_fft import lagrange_setup
+
+    s = secrets.randbelow(MODULUS)
+    n = 8
+    for compressed in [False, True]:
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "test.srs")
+            generate_srs(path, s, n, 2, [n // 2, n], compressed, workers=2, chunk=3)
+            srs = load_srs(path)
+            assert len(srs.g1) == n and len(srs.g2) == 2
+            assert srs.g1[:] == [fixed_base_mul(pow(s, i, MODULUS)) for i in range(n)]
+            assert srs.g2[1] == fixed_base_mul(s, g2=True)
+            for size in [n // 2, n]:
+                assert srs.lagrange(size)[:] == lagrange_setup(srs.g1[:size], MODULUS, _root_of_unity(size))
+            assert srs.lagrange(n, shift=5) is None
+            srs.verify(workers=2, chunk=3)
+            srs.close()
+    print("test_srs_file passed")
+
+
+def test_srs_checks():
+    import tempfile
+    from ec import y_for_x
+
+    def off_subgroup(ec, FE):
+        # uncompressed point of the curve outside of the order n subgroup
+        for i in range(1, 100):
+            x = FE.from_bytes(bytes(48 * FE.extension - 1) + bytes([i]), ec.q)
+            try:
+                a = AffinePoint(x, y_for_x(x, ec, FE), False, ec)
+            except ValueError:
+                continue
+            if not in_subgroup(a.to_jacobian()):
+                return bytes(a.x) + bytes(a.y)
+
+    n = 4
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "test.srs")
+        generate_srs(path, secrets.randbelow(MODULUS), n, 3, [n], workers=1)
+        load_srs(path, check=True).close()
+        with open(path, "rb") as f:
+            data = f.read()
+        size1, size2 = point_size(False, False), point_size(True, False)
+        g1 = HEADER.size + 3 * ENTRY.size
+        g2 = g1 + n * size1
+        lagrange = g2 + 3 * size2
+
+        def error(pos, new, check=False, rehash=False):
+            # the error loading data with new at pos (and the header digest
+            # updated if rehash), None if it loads
+            out = data[:pos] + new + data[pos + len(new) :]
+            if rehash:
+                out = HEADER.pack(MAGIC, 0, 3, hashlib.sha256(out[HEADER.size :]).digest()) + out[HEADER.size :]
+            with open(path, "wb") as f:
+                f.write(out)
+            try:
+                srs = load_srs(path, check)
+                try:
+                    srs.g1[:]
+                    srs.g2[:]
+                finally:
+                    srs.close()
+            except ValueError as e:
+                return str(e)
+            return None
+
+        def flip(pos):
+            return bytes([data[pos] ^ 1])
+
+        # the first G1 point, the x of a point, anywhere with the checksum
+        assert error(g1 + 5, flip(g1 + 5))
+        assert "curve" in error(g1 + 2 * size1 + 5, flip(g1 + 2 * size1 + 5))
+        assert error(len(data) - 1, flip(len(data) - 1)) is None
+        assert "checksum" in error(len(data) - 1, flip(len(data) - 1), True)
+        # valid points in the wrong place, with a matching checksum
+        other1 = encode_points([G1Generator() * 999], False)
+        other2 = encode_points([G2Generator() * 999], False)
+        for pos, new, msg in [(g1 + 3 * size1, other1, "G1 powers"),
+                              (g2 + 2 * size2, other2, "G2 powers"),
+                              (lagrange + size1, other1, "Lagrange")]:
+            assert error(pos, new, rehash=True) is None
+            assert msg in error(pos, new, True, True)
+        # points of the curves outside of the subgroups
+        assert error(g1 + 2 * size1, off_subgroup(default_ec, Fq), rehash=True) is None
+        assert "subgroup" in error(g1 + 2 * size1, off_subgroup(default_ec, Fq), True, True)
+        assert "subgroup" in error(g2 + size2, off_subgroup(default_ec_twist, Fq2), rehash=True)
+    print("test_srs_checks passed")
+
+
+def test_srs_poly_commitment():
+    import tempfile
+    from poly_commit import PolyCommitment
+
+    n = 8
+    with tempfile.TemporaryDirectory() as d:
+        path = os.path.join(d, "test.srs")
+        generate_srs(path, secrets.randbelow(MODULUS), n, 2, [n], workers=1)
+        pc = PolyCommitment(load_srs(path))
+        G = _root_of_unity(n)
+        evals = [pc.rand() for i in range(n)]
+        commit = pc.getCommitment(evals, G)
+        proof = pc.getSingleProofByEvalIdx(evals, G, 3)
+        assert pc.verifySingleProof(commit, proof, pow(G, 3, MODULUS), evals[3])
+        pc.srs.close()
+    print("test_srs_poly_commitment passed")
+
+
+def main(argv):
+    parser = argparse.ArgumentParser(description="KZG structured reference string files")
+    sub = parser.add_subparsers(dest="command", required=True)
+    gen = sub.add_parser("generate", help="write an SRS file from a (random) secret")
+    gen.add_argument("path")
+    gen.add_argument("--g1", type=int, required=True, help="number of G1 powers")
+    gen.add_argument("--g2", type=int, default=2, help="number of G2 powers")
+    gen.add_argument("--lagrange", type=int, nargs="*", default=[],
+                     help="domain sizes (powers of 2) of the G1 Lagrange sections")
+    gen.add_argument("--compressed", action="store_true")
+    gen.add_argument("--secret", type=lambda x: int(x, 0), default=None,
+                     help="secret for testing, random if omitted")
+    gen.add_argument("--workers", type=int, default=None)
+    info = sub.add_parser("info", help="print the sections of an SRS file")
+    info.add_argument("path")
+    info.add_argument("--verify", action="store_true", help="also check the checksum, the subgroups and that the "
+                           "sections are powers of one secret")
+    args = parser.parse_args(argv)
+
+    if args.command == "generate":
+        secret = secrets.randbelow(MODULUS) if args.secret is None else args.secret
+        start_time = time.time()
+        generate_srs(args.path, secret, args.g1, args.g2, args.lagrange, args.compressed, args.workers)
+        print("%s written in %.1f s" % (args.path, time.time() - start_time))
+    else:
+        start_time = time.time()
+        srs = load_srs(args.path, args.verify)
+        print("loaded%s in %.1f ms, %s points" % (
+            " and verified" if args.verify else "", (time.time() - start_time) * 1000,
+            "compressed" if srs.compressed else "uncompressed"))
+        print("G1 powers: %d, G2 powers: %d" % (len(srs.g1), len(srs.g2)))
+        for size, _, shift in sorted(srs.lagranges):
+            print("G1 Lagrange: domain size %d, shift %d" % (size, shift))
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main(sys.argv[1:])
+    else:
+        test_srs_file()
+        test_srs_checks()
+        test_srs_poly_commitment()
@@ -4,6 +4,7 @@ import cProfile
 from py_ecc import optimized_bls12_381 as b
 from imported.kzg_proofs import get_root_of_unity, list_to_reverse_bit_order
 from imported.fft import fft, expand_root_of_unity
+from fft import fft_many
 from imported.poly_utils import PrimeField
 from das_rec_utils import eval_poly_in_eval_form_with_coset, eval_poly_in_eval_form_with_coset_and_cache, inv_omega_diff
 from recovery import erasure_code_recover
@@ -81,8 +82,8 @@ def rec_poly_with_coset_fft(self, ys, ru_list, xidx, rus, nxidx, nys):
     # evaluate the coefficents the reduced polynomial
     t = time.time()
     fs = []
-    for i in range(m_in):
-        coeff = fft([ys[i*n+k] for k in rbo_coset], modulus, ru_coset, True)
+    coeffs = fft_many([[ys[i*n+k] for k in rbo_coset] for i in range(m_in)], modulus, ru_coset, True)
+    for i, coeff in enumerate(coeffs):
         # div h_i
         coeff = [self.mul(c, ru_list[-hidx[i] * k]) for k, c in enumerate(coeff)]
         fs.extend(coeff)
@@ -107,12 +108,12 @@ def rec_poly_with_coset_fft(self, ys, ru_list, xidx, rus, nxidx, nys):
 
     nys = []
     m = len(datas) // n
+    coeffs = []
     for i in range(m_out):
         coeff = datas[nhidx[i]::m]
-        coeff = [self.mul(c, ru_list[nhidx[i] * k]) for k, c in enumerate(coeff)]
-        ny = fft(coeff, modulus, ru_coset)
-        ny = [ny[i] for i in rbo_coset]
-        nys.extend(ny)
+        coeffs.append([self.mul(c, ru_list[nhidx[i] * k]) for k, c in enumerate(coeff)])
+    for ny in fft_many(coeffs, modulus, ru_coset):
+        nys.extend([ny[i] for i in rbo_coset])
 
     return nys
 
@@ -5,7 +5,10 @@ from py_ecc import optimized_bls12_381 as b
 from imported.kzg_proofs import get_root_of_unity, list_to_reverse_bit_order
 from imported.fft import fft
 from imported.poly_utils import PrimeField
-from das_rec_utils import eval_poly_in_eval_form_with_coset, eval_poly_in_eval_form_with_coset_and_cache, inv_omega_diff
+import poly_utils
+from poly_utils import get_evaluation_domain
+from subproduct_tree import SubproductTree
+from das_rec_utils import eval_poly_in_eval_form_with_coset, eval_poly_in_eval_form_with_coset_and_cache
 
 profiling = False
 
@@ -14,7 +17,9 @@ ALG_SAMPLE_NAIVE = 2
 ALG_SAMPLE_COSET = 3
 ALG_SAMPLE_COSET_CACHE = 4
 ALG_SAMPLE_COSET_FFT = 5
-algorithms = {1,2,3,4,5}
+ALG_COEFF_TREE = 6
+ALG_SAMPLE_TREE = 7
+algorithms = {1,2,3,4,5,6,7}
 
 # number of samples after encoding
 n_samples = 512
@@ -33,6 +38,10 @@ root_of_unity2 = get_root_of_unity(n_blobs)
 # order of FQ
 modulus = b.curve_order
 pf = PrimeField(modulus, 1)
+# field with NTT multiplication and Newton division for the subproduct trees
+fpf = poly_utils.PrimeField(modulus)
+# cached powers of root_of_unity and 1 / (w^i - 1), shared by all blobs
+domain = get_evaluation_domain(fpf, root_of_unity, n_elements)
 
 # unencoded data
 blobs = [random.randint(0, modulus - 1) for i in range(n_blobs)]
@@ -69,6 +78,16 @@ if ALG_COEFF_NAIVE in algorithms:
         pr.disable()
         pr.print_stats(sort="calls")
 
+# subproduct tree interpolation, the tree only depends on the positions of
+# the available samples and can be reused for other blobs with the same layout
+if ALG_COEFF_TREE in algorithms:
+    start_time = time.monotonic()
+    xs_tree = SubproductTree(fpf, xs)
+    print("Subproduct tree built in: {} s".format(time.monotonic() - start_time))
+    coeffs_rec = xs_tree.interp(ys)
+    assert coeffs == coeffs_rec
+    print("Coefficient recovery (tree) used time: {} s".format(time.monotonic() - start_time))
+
 # reconstruct the rest samples natively (note that recovering (at most) half of the rest is enough)
 nxs = [x for i in missing for x in x_row[i*n_elements_ps:(i+1)*n_elements_ps]]
 nys = [x for i in missing for x in y_row[i*n_elements_ps:(i+1)*n_elements_ps]]
@@ -106,8 +125,7 @@ if ALG_SAMPLE_COSET_CACHE in algorithms:
         pr.enable()
     xidx = [x for i in selected for x in rbo[i*n_elements_ps:(i+1)*n_elements_ps]]
     nxidx = [x for i in missing for x in rbo[i*n_elements_ps:(i+1)*n_elements_ps]]
-    ru_list = [pf.exp(root_of_unity, i) for i in range(n_elements)]
-    nys_rec = eval_poly_in_eval_form_with_coset_and_cache(pf, ys, ru_list, xidx, x_row[0:n_elements_ps], nxidx)
+    nys_rec = eval_poly_in_eval_form_with_coset_and_cache(pf, ys, domain, xidx, x_row[0:n_elements_ps], nxidx)
     assert nys == nys_rec
     print("All sample recovery used time: {} s".format(time.monotonic() - start_time))
     if profiling:
@@ -115,11 +133,9 @@ if ALG_SAMPLE_COSET_CACHE in algorithms:
         pr.print_stats(sort="calls")
 
 # reconstruct the rest samples using coset fft
-def eval_poly_in_eval_form_with_fft(self, ys, ru_list, xidx, rus, nxidx):
+def eval_poly_in_eval_form_with_fft(self, ys, domain, xidx, rus, nxidx):
     # rus - roots of unity of coset order
-
-    # pre-compuate \omega^i - 1
-    oi1 = [self.inv(ru_list[i] - 1) for i in range(1, len(ru_list))]
+    ru_list = domain.xs
 
     # order of coset
     n = len(rus)
@@ -166,7 +182,7 @@ def eval_poly_in_eval_form_with_fft(self, ys, ru_list, xidx, rus, nxidx):
     for i in range(m_out):
         mx = self.eval_poly_at(root, self.exp(nxs[i*n], n))
         # 1 / Z_{alpha_i}(h_k)
-        denom = [inv_omega_diff(self, oi1, ru_list, nhidx[i] * n, hidx[j] * n) for j in range(m_in)]
+        denom = [domain.inv_diff(nhidx[i] * n, hidx[j] * n) for j in range(m_in)]
         for j in range(n):
             ny = sum(g * f * d for g, f, d in zip(gs, fs[i*n+j::n*m_out], denom))
             ny = self.mul(mx, ny)
@@ -181,10 +197,30 @@ if ALG_SAMPLE_COSET_FFT in algorithms:
         pr.enable()
     xidx = [x for i in selected for x in rbo[i*n_elements_ps:(i+1)*n_elements_ps]]
     nxidx = [x for i in missing for x in rbo[i*n_elements_ps:(i+1)*n_elements_ps]]
-    ru_list = [pf.exp(root_of_unity, i) for i in range(n_elements)]
-    nys_rec = eval_poly_in_eval_form_with_fft(pf, ys, ru_list, xidx, x_row[0:n_elements_ps], nxidx)
+    nys_rec = eval_poly_in_eval_form_with_fft(pf, ys, domain, xidx, x_row[0:n_elements_ps], nxidx)
     assert nys == nys_rec
     print("All sample recovery used time: {} s".format(time.monotonic() - start_time))
     if profiling:
         pr.disable()
         pr.print_stats(sort="calls")
+
+# evaluate the interpolated polynomial at the missing positions with a
+# subproduct tree over them
+if ALG_SAMPLE_TREE in algorithms:
+    start_time = time.monotonic()
+    if profiling:
+        pr = cProfile.Profile()
+        pr.enable()
+    xs_tree = SubproductTree(fpf, xs)
+    nxs_tree = SubproductTree(fpf, nxs)
+    nys_rec = nxs_tree.multi_eval(xs_tree.interp(ys))
+    assert nys == nys_rec
+    print("All sample recovery (tree) used time: {} s".format(time.monotonic() - start_time))
+    # the trees are reused for the next blob with the same layout
+    start_time = time.monotonic()
+    nys_rec = nxs_tree.multi_eval(xs_tree.interp(ys))
+    assert nys == nys_rec
+    print("All sample recovery (cached tree) used time: {} s".format(time.monotonic() - start_time))
+    if profiling:
+        pr.disable()
+        pr.print_stats(sort="calls")
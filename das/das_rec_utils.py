@@ -42,11 +42,11 @@ def inv_omega_diff(self, oi1, ru_list, idx1, idx2):
         return self.mul(ru_list[-idx1], -oi1[idx2 - idx1 - 1])
 
 
-def eval_poly_in_eval_form_with_coset_and_cache(self, ys, ru_list, xidx, rus, nxidx):
+def eval_poly_in_eval_form_with_coset_and_cache(self, ys, domain, xidx, rus, nxidx):
     # rus - roots of unity of coset order
-
-    # pre-compuate \omega^i - 1
-    oi1 = [self.inv(ru_list[i] - 1) for i in range(1, len(ru_list))]
+    # domain - poly_utils.EvaluationDomain over all the roots of unity, which
+    #          caches the powers and 1 / (\omega^i - 1) across calls
+    ru_list = domain.xs
 
     n = len(rus)
     ni = self.inv(n)
@@ -75,7 +75,7 @@ def eval_poly_in_eval_form_with_coset_and_cache(self, ys, ru_list, xidx, rus, nx
 
     nys = []
     # batch inverse the single denominators for each basis
-    denoms = [inv_omega_diff(self, oi1, ru_list, i, j) for i in nxidx for j in xidx]
+    denoms = [domain.inv_diff(i, j) for i in nxidx for j in xidx]
     for i in range(len(nxs)):
         v = sum(x * y for x, y in zip(denoms[i*len(xs):(i+1)*len(xs)], ygs))
         ny = self.mul(self.eval_poly_at(root, self.exp(nxs[i], n)), v)
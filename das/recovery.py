@@ -1,4 +1,4 @@
-from fft import fft, mul_polys
+from fft import fft, mul_polys, coset_fft, coset_ifft
 
 # Calculates modular inverses [1/values[0], 1/values[1] ...]
 def multi_inv(values, modulus):
@@ -81,27 +81,21 @@ def erasure_code_recover(vals, modulus, root_of_unity, z=None, zvals=None, inv_z
     k = 5
     if pow(k, (modulus - 1) // 2, modulus) == 1:
         return None, None, None, None
-    invk = pow(k, modulus - 2, modulus)
     # Convert p_times_z(x) and z(x) into new polynomials
     # q1(x) = p_times_z(k*x) and q2(x) = z(k*x)
     # These are likely to not be 0 at any of the evaluation points.
-    p_times_z_of_kx = [x * pow(k, i, modulus) % modulus
-                        for i, x in enumerate(p_times_z)]
-    p_times_z_of_kx_vals = fft(p_times_z_of_kx, modulus, root_of_unity, rootz=rootz)
+    p_times_z_of_kx_vals = coset_fft(p_times_z, modulus, root_of_unity, k)
 
     if inv_z_of_kv_vals is None:
-        z_of_kx = [x * pow(k, i, modulus) for i, x in enumerate(z)]
-        z_of_kx_vals = fft(z_of_kx, modulus, root_of_unity, rootz=rootz)
+        z_of_kx_vals = coset_fft(z, modulus, root_of_unity, k)
         
         # Compute q1(x) / q2(x) = p(k*x)
         inv_z_of_kv_vals = multi_inv(z_of_kx_vals, modulus)
     p_of_kx_vals = [x*y % modulus for x,y in
                     zip(p_times_z_of_kx_vals, inv_z_of_kv_vals)]
-    p_of_kx = fft(p_of_kx_vals, modulus, root_of_unity, inv=True, rootz=rootz)
 
     # Given q3(x) = p(k*x), recover p(x)
-    p_of_x = [x * pow(invk, i, modulus) % modulus
-                for i, x in enumerate(p_of_kx)]
+    p_of_x = coset_ifft(p_of_kx_vals, modulus, root_of_unity, k)
     if retCoeff:
         return p_of_x, z, zvals, inv_z_of_kv_vals
     output = fft(p_of_x, modulus, root_of_unity, rootz=rootz)
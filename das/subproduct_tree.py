@@ -0,0 +1,132 @@
+# Subproduct tree over a set of points xs: the leaves are (x - xs[i]) and
+# every node is the product of its two children, so node i of level l is
+# the vanishing polynomial of xs[i*2^l:(i+1)*2^l].  Multipoint evaluation
+# walks the tree top-down reducing the polynomial modulo each node, and
+# interpolation combines the scaled leaves bottom-up, both O(n log^2 n)
+# with NTT multiplication.
+#
+# The tree only depends on xs, so it can be built once and reused for all
+# blobs that share the same sample layout.
+#
+# pf is a poly_utils.PrimeField.
+class SubproductTree():
+    # below this node size the remainders are evaluated with Horner's rule
+    HORNER_THRESHOLD = 16
+
+    def __init__(self, pf, xs):
+        self.pf = pf
+        self.xs = list(xs)
+        m = pf.modulus
+        level = [[-x % m, 1] for x in self.xs]
+        self.levels = [level]
+        while len(level) > 1:
+            nxt = [pf.mul_polys(level[i], level[i+1]) for i in range(0, len(level) - 1, 2)]
+            if len(level) % 2 == 1:
+                nxt.append(level[-1])
+            level = nxt
+            self.levels.append(level)
+        # power series inverses of the reversed nodes, see _rem
+        self._rev_invs = {}
+        # 1 / M'(xs[i]) for interpolation
+        self._weights = None
+
+    # Vanishing polynomial of all the points
+    def root(self):
+        return self.levels[-1][0]
+
+    # a mod node (l, i), caching the reversed node inverse for Newton
+    # division so that repeated evaluations do not recompute it
+    def _rem(self, a, l, i):
+        pf = self.pf
+        b = self.levels[l][i]
+        if len(a) < len(b):
+            return a
+        r = len(b) - 1
+        k = len(a) - r
+        if r < pf.NEWTON_THRESHOLD or k > r:
+            return pf.mod_polys(a, b)
+        if (l, i) not in self._rev_invs:
+            self._rev_invs[(l, i)] = pf.inv_series(b[::-1], r)
+        q = pf.mul_polys(a[::-1][:k], self._rev_invs[(l, i)][:k])[:k][::-1]
+        return pf.sub_polys(a[:r], pf.mul_polys(b[:r], q[:r])[:r])
+
+    # Evaluate poly at all the points
+    def multi_eval(self, poly):
+        pf = self.pf
+        n = len(self.xs)
+        if n == 0:
+            return []
+        top = len(self.levels) - 1
+        rems = [self._rem(poly, top, 0)]
+        # descend while the nodes are large enough for the tree to pay off
+        l = top
+        while l > 0 and (1 << l) > self.HORNER_THRESHOLD:
+            l -= 1
+            rems = [self._rem(rems[i // 2], l, i) for i in range(len(self.levels[l]))]
+        size = 1 << l
+        o = []
+        for i, rem in enumerate(rems):
+            for x in self.xs[i*size:(i+1)*size]:
+                o.append(pf.eval_poly_at(rem, x))
+        return o
+
+    # Coefficients of the polynomial of degree < len(xs) through (xs, ys)
+    def interp(self, ys):
+        pf = self.pf
+        m = pf.modulus
+        assert len(ys) == len(self.xs)
+        if not self.xs:
+            return []
+        if self._weights is None:
+            root = self.root()
+            deriv = [(i + 1) * c % m for i, c in enumerate(root[1:])]
+            self._weights = pf.multi_inv(self.multi_eval(deriv))
+        level = [[y * w % m] for y, w in zip(ys, self._weights)]
+        for l in range(len(self.levels) - 1):
+            nodes = self.levels[l]
+            nxt = []
+            for i in range(0, len(level) - 1, 2):
+                nxt.append(pf.add_polys(pf.mul_polys(level[i], nodes[i+1]),
+                                        pf.mul_polys(level[i+1], nodes[i])))
+            if len(level) % 2 == 1:
+                nxt.append(level[-1])
+            level = nxt
+        o = level[0] if level else []
+        return o + [0] * (len(self.xs) - len(o))
+
+
+# Evaluate poly at every x in xs
+def multi_eval(pf, poly, xs):
+    return SubproductTree(pf, xs).multi_eval(poly)
+
+
+# Interpolate the polynomial of degree < len(xs) through (xs, ys)
+def fast_interp(pf, xs, ys):
+    return SubproductTree(pf, xs).interp(ys)
+
+
+def test_subproduct_tree():
+    import random
+    from poly_utils import PrimeField
+
+    pf = PrimeField(0x73eda753299d7d483339d80809a1d80553bda402fffe5bfeffffffff00000001)
+    m = pf.modulus
+    assert SubproductTree(pf, []).interp([]) == []
+    assert multi_eval(pf, [1, 2], []) == []
+    # odd sizes carry the last node up a level, 301 > NEWTON_THRESHOLD
+    for n in [1, 3, 5, 17, 33, 301]:
+        xs = list({random.randrange(m) for i in range(n)})
+        ys = [random.randrange(m) for i in range(n)]
+        tree = SubproductTree(pf, xs)
+        coeffs = tree.interp(ys)
+        assert coeffs == pf.lagrange_interp(xs, ys)
+        assert tree.multi_eval(coeffs) == ys
+        # longer than the tree root, so that the top is reduced too
+        poly = [random.randrange(m) for i in range(n + n // 2 + 1)]
+        assert multi_eval(pf, poly, xs) == [pf.eval_poly_at(poly, x) for x in xs]
+        assert fast_interp(pf, xs, ys) == coeffs
+    print("test_subproduct_tree passed")
+
+
+if __name__ == "__main__":
+    test_subproduct_tree()
@@ -2,7 +2,8 @@
 # Given the full data blobs and their commitments, verify the correctness of the commitment using single pairing operation
 # Instead of calculating each commitments individually (efficient when the list of data is long)
 
-from ec import G1Generator, default_ec, G2Generator
+from ec import G1Generator, default_ec, G2Generator, fixed_base_mul, fixed_base_mul_many
+from ec_fft import lagrange_setup
 from fields import Fq
 import random
 from evaluation_form import eval_poly_in_eval_form, fq_sum, single_proof_in_eval_form
@@ -26,8 +27,9 @@ data_vec = [[Fq(order, random.randint(0, order - 1)) for i in range(nroots)] for
 
 primitive = 7
 roots = [Fq(order, primitive) ** (i * (order - 1) // nroots)  for i in range(nroots)]
-# Lagrange trust setup
-sec_roots = [(secret ** nroots - Fq(order, 1)) * w / Fq(order, nroots) / (secret - w) * g1 for w in roots]
+# Lagrange trust setup, from the s^i setup with an EC-FFT
+sec_vec = fixed_base_mul_many([secret ** i for i in range(nroots)])
+sec_roots = lagrange_setup(sec_vec, order, pow(primitive, (order - 1) // nroots, order))
 
 commits = [sum(s * y for s, y in zip(sec_roots, vec)) for vec in data_vec]
 
@@ -39,7 +41,7 @@ assert commit == sum(s * y for s, y in zip(sec_roots, aggr_vec))
 y = eval_poly_in_eval_form(x, aggr_vec, roots)
 
 # Check if y and x is on the curve via (C - y) = q(x) * (s - x)
-cy = commit + (y * g1).negate()
+cy = commit + fixed_base_mul(y).negate()
 qs = single_proof_in_eval_form(sec_roots, aggr_vec, roots, x, y)
 sx = (x - secret) * g2 # can be done in trusted setup
 pair0 = ate_pairing(cy, g2)
@@ -1,11 +1,12 @@
 from __future__ import annotations
 
+import os
 from collections import namedtuple
 from copy import deepcopy
 from typing import List, Optional
 
 import bls12381
-from fields import FieldExtBase, Fq, Fq2, Fq6, Fq12
+from fields import FieldExtBase, Fq, Fq2, Fq6, Fq12, field_class
 from util import hash256
 
 # Struct for elliptic curve parameters
@@ -28,7 +29,7 @@ class AffinePoint:
             or type(x) != type(y)
         ):
             raise Exception("x,y should be field elements")
-        self.FE = type(x)
+        self.FE = field_class(x)
         self.x = x
         self.y = y
         self.infinity = infinity
@@ -132,7 +133,7 @@ class JacobianPoint:
             or (not isinstance(z, Fq) and not isinstance(z, FieldExtBase))
         ):
             raise Exception("x,y should be field elements")
-        self.FE = type(x)
+        self.FE = field_class(x)
         self.x = x
         self.y = y
         self.z = z
@@ -158,7 +159,7 @@ class JacobianPoint:
 
     def check_valid(self) -> None:
         assert self.is_on_curve()
-        assert self * self.ec.n == G2Infinity()
+        assert in_subgroup(self)
 
     def get_fingerprint(self) -> int:
         ser = bytes(self)
@@ -184,6 +185,9 @@ class JacobianPoint:
         return not self.__eq__(other)
 
     def __mul__(self, c) -> JacobianPoint:
+        # For BLS12-381 G1 / G2 points this uses the GLV / GLS endomorphisms,
+        # so the result is only defined for points of the order n subgroup
+        # (except for multiples of n); see scalar_mult_jacobian.
         if not isinstance(c, int) and not isinstance(c, Fq):
             raise ValueError("Error, must be int or Fq")
         return scalar_mult_jacobian(c, self, self.ec)
@@ -237,15 +241,14 @@ def sign_Fq2(element, ec=default_ec_twist) -> bool:
     return element[1] > Fq(ec.q, ((ec.q - 1) // 2))
 
 
-def point_to_bytes(point_j: JacobianPoint, ec, FE) -> bytes:
-    point = point_j.to_affine()
+def point_to_bytes(point_j, ec, FE) -> bytes:
+    point = point_j.to_affine() if isinstance(point_j, JacobianPoint) else point_j
+    if point.infinity:
+        return bytes([0xC0]) + bytes([0] * (48 * FE.extension - 1))
     output = bytearray(bytes(point.x))
 
     # If the y coordinate is the bigger one of the two, set the first
     # bit to 1.
-    if point.infinity:
-        return bytes([0x40]) + bytes([0] * (len(output) - 1))
-
     if FE == Fq:
         sign = sign_Fq(point.y, ec)
     else:
@@ -258,6 +261,14 @@ def point_to_bytes(point_j: JacobianPoint, ec, FE) -> bytes:
     return bytes(output)
 
 
+def points_to_bytes(points: List[JacobianPoint]) -> List[bytes]:
+    """
+    Serializes many points with a single field inversion, see
+    batch_to_affine.
+    """
+    return [point_to_bytes(p, p.ec, p.FE) for p in batch_to_affine(points)]
+
+
 def bytes_to_point(buffer: bytes, ec, FE) -> JacobianPoint:
     # Zcash serialization described in https://datatracker.ietf.org/doc/draft-irtf-cfrg-pairing-friendly-curves/
 
@@ -284,7 +295,7 @@ def bytes_to_point(buffer: bytes, ec, FE) -> JacobianPoint:
 
     buffer = bytes([buffer[0] & 0x1F]) + buffer[1:]
 
-    if I_bit == 1:
+    if I_bit:
         if any([e != 0 for e in buffer]):
             raise ValueError("Point at infinity set, but data not all zeroes")
         return AffinePoint(FE.zero(ec.q), FE.zero(ec.q), True, ec).to_jacobian()
@@ -297,7 +308,7 @@ def bytes_to_point(buffer: bytes, ec, FE) -> JacobianPoint:
     else:
         sign_fn = sign_Fq2
 
-    if sign_fn(y_value, ec) == S_bit:
+    if sign_fn(y_value, ec) == bool(S_bit):
         y = y_value
     else:
         y = -y_value
@@ -426,6 +437,77 @@ def add_points_jacobian(
     return JacobianPoint(X3, Y3, Z3, False, ec)
 
 
+def add_points_mixed(
+    p1: JacobianPoint, p2: AffinePoint, ec=default_ec, FE=Fq
+) -> JacobianPoint:
+    """
+    Addition of a Jacobian and an affine point (Z2 = 1), see madd-2007-bl in
+    http://www.hyperelliptic.org/EFD/g1p/auto-shortw-jacobian.html
+    """
+    if p2.infinity:
+        return p1
+    if p1.infinity:
+        return p2.to_jacobian()
+    X1, Y1, Z1 = p1.x, p1.y, p1.z
+    Z1Z1 = Z1 * Z1
+    # U2 = X2*Z1^2, S2 = Y2*Z1^3
+    U2 = p2.x * Z1Z1
+    S2 = p2.y * Z1 * Z1Z1
+    H = U2 - X1
+    S = S2 - Y1
+    if H == FE.zero(ec.q):
+        if S == FE.zero(ec.q):
+            return double_point_jacobian(p1, ec, FE)
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    HH = H * H
+    # I = 4*HH, J = H*I, r = 2*(S2 - Y1), V = X1*I
+    I = HH + HH
+    I = I + I
+    J = H * I
+    r = S + S
+    V = X1 * I
+    # X3 = r^2 - J - 2*V
+    X3 = r * r - J - V - V
+    # Y3 = r*(V - X3) - 2*Y1*J
+    Y1J = Y1 * J
+    Y3 = r * (V - X3) - Y1J - Y1J
+    # Z3 = (Z1 + H)^2 - Z1Z1 - HH = 2*Z1*H
+    Z1H = Z1 * H
+    Z3 = Z1H + Z1H
+    return JacobianPoint(X3, Y3, Z3, False, ec)
+
+
+def batch_to_affine(points: List[JacobianPoint]) -> List[AffinePoint]:
+    """
+    Converts all points to affine coordinates with a single field inversion
+    (Montgomery's trick): invert the product of all the Z and recover each
+    1/Z from the prefix products.
+    """
+    zs = [p.z for p in points if not p.infinity]
+    if len(zs) == 0:
+        return [p.to_affine() for p in points]
+    prefix = [zs[0]]
+    for z in zs[1:]:
+        prefix.append(prefix[-1] * z)
+    inv = ~prefix[-1]
+    zinvs = [None] * len(zs)
+    for i in range(len(zs) - 1, 0, -1):
+        zinvs[i] = inv * prefix[i - 1]
+        inv = inv * zs[i]
+    zinvs[0] = inv
+    out = []
+    j = 0
+    for p in points:
+        if p.infinity:
+            out.append(p.to_affine())
+            continue
+        zinv = zinvs[j]
+        j += 1
+        zinv2 = zinv * zinv
+        out.append(AffinePoint(p.x * zinv2, p.y * zinv2 * zinv, False, p.ec))
+    return out
+
+
 def scalar_mult(c, p1: AffinePoint, ec=default_ec, FE=Fq) -> AffinePoint:
     """
     Double and add, see
@@ -446,27 +528,428 @@ def scalar_mult(c, p1: AffinePoint, ec=default_ec, FE=Fq) -> AffinePoint:
     return result
 
 
-def scalar_mult_jacobian(c, p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPoint:
+def wnaf(c: int, w: int) -> List[int]:
     """
-    Double and add, see
-    https://en.wikipedia.org/wiki/Elliptic_curve_point_multiplication
+    Width-w non-adjacent form of c >= 0, least significant digit first.
+    Non-zero digits are odd, |d| < 2^(w-1), and any w consecutive digits
+    contain at most one of them.
+    """
+    digits = []
+    while c > 0:
+        if c & 1:
+            d = c & ((1 << w) - 1)
+            if d >= 1 << (w - 1):
+                d -= 1 << w
+            c -= d
+        else:
+            d = 0
+        digits.append(d)
+        c >>= 1
+    return digits
+
+
+def _negate_jacobian(p: JacobianPoint) -> JacobianPoint:
+    return JacobianPoint(p.x, -p.y, p.z, p.infinity, p.ec)
+
+
+def _odd_multiples(p: JacobianPoint, w: int, ec, FE) -> List[JacobianPoint]:
+    # [P, 3P, 5P, ..., (2^(w-1) - 1)P]
+    table = [p]
+    p2 = double_point_jacobian(p, ec, FE)
+    for i in range(1, 1 << (w - 2)):
+        table.append(table[-1] + p2)
+    return table
+
+
+def _straus_wnaf(tables, scalars, w: int, ec, FE) -> JacobianPoint:
+    """
+    sum(k * T[0]) for the odd-multiple tables T and signed scalars k,
+    interleaving the wNAF digits so that all the scalars share one chain
+    of doublings.
+    """
+    nafs = []
+    for k in scalars:
+        naf = wnaf(abs(k), w)
+        nafs.append([-d for d in naf] if k < 0 else naf)
+    result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    for i in reversed(range(max(len(naf) for naf in nafs))):
+        result = double_point_jacobian(result, ec, FE)
+        for table, naf in zip(tables, nafs):
+            if i < len(naf) and naf[i] != 0:
+                d = naf[i]
+                if d > 0:
+                    result += table[d >> 1]
+                else:
+                    result += _negate_jacobian(table[-d >> 1])
+    return result
+
+
+def scalar_mult_wnaf(c, p1: JacobianPoint, ec=default_ec, FE=Fq, w: int = 5) -> JacobianPoint:
     """
-    if isinstance(c, FE):
+    Width-w NAF scalar multiplication, valid for any point (e.g. clearing
+    the cofactor or checking the order of an untrusted point).
+    """
+    if isinstance(c, Fq):
         c = c.value
     if p1.infinity or c % ec.q == 0:
         return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    if c < 0:
+        c, p1 = -c, _negate_jacobian(p1)
+    return _straus_wnaf([_odd_multiples(p1, w, ec, FE)], [c], w, ec, FE)
 
-    result = JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
-    addend = p1
-    while c > 0:
-        if c & 1:
-            result += addend
-        # double point
-        addend += addend
-        c = c >> 1
+
+# G1: φ(x, y) = (β x, y) acts on G1 as multiplication by λ = x^2 - 1,
+# a root of λ^2 + λ + 1 = n
+glv_beta = Fq(bls12381.q, bls12381.sqrt_n3m1o2 ** 2)
+glv_lambda = bls12381.x ** 2 - 1
+
+# G2: ψ(x, y) = (c1 conj(x), c2 conj(y)), untwist-Frobenius-twist, acts on
+# G2 as multiplication by q = x (mod n)
+gls_c1 = ~(Fq2(bls12381.q, 1, 1) ** ((bls12381.q - 1) // 3))
+gls_c2 = ~(Fq2(bls12381.q, 1, 1) ** ((bls12381.q - 1) // 2))
+
+
+def glv_endomorphism(p: JacobianPoint) -> JacobianPoint:
+    # x = X / Z^2, so φ only scales X
+    return JacobianPoint(p.x * glv_beta, p.y, p.z, p.infinity, p.ec)
+
+
+def _conj(a: Fq2) -> Fq2:
+    return a._new(a[0].value, -a[1].value)
+
+
+def gls_endomorphism(p: JacobianPoint) -> JacobianPoint:
+    # conjugation is a field automorphism, so it commutes with X / Z^2
+    return JacobianPoint(gls_c1 * _conj(p.x), gls_c2 * _conj(p.y), _conj(p.z), p.infinity, p.ec)
+
+
+def glv_decompose(c: int):
+    """
+    c = k1 + k2 λ (mod n) with 0 <= k1 < λ and k2 <= λ + 1, both ~128 bits.
+    """
+    k2, k1 = divmod(c % bls12381.n, glv_lambda)
+    return k1, k2
+
+
+def gls_decompose(c: int):
+    """
+    c = k0 + k1 x + k2 x^2 + k3 x^3 (mod n) with |ki| <= 2^64: the base |x|
+    digits of c with the signs of x^i, the fifth digit folded back with
+    x^4 = x^2 - 1 (mod n).
+    """
+    m = -bls12381.x
+    a = []
+    c %= bls12381.n
+    for i in range(5):
+        c, d = divmod(c, m)
+        a.append(d)
+    return a[0] - a[4], -a[1], a[2] + a[4], -a[3]
+
+
+def _is_bls_g1(p1: JacobianPoint, ec) -> bool:
+    return p1.FE is Fq and ec.q == bls12381.q and ec.b == bls12381.b
+
+
+def _is_bls_g2(p1: JacobianPoint, ec) -> bool:
+    return p1.FE is Fq2 and ec.q == bls12381.q and ec.b == bls12381.b_twist
+
+
+def scalar_mult_glv(c, p1: JacobianPoint, ec=default_ec, w: int = 4) -> JacobianPoint:
+    """
+    c * P for P in G1 with the GLV decomposition c = k1 + k2 λ: one wNAF
+    multi-exponentiation of (P, φ(P)) with half-length scalars.
+    """
+    table = _odd_multiples(p1, w, ec, Fq)
+    k1, k2 = glv_decompose(c)
+    return _straus_wnaf([table, [glv_endomorphism(t) for t in table]], [k1, k2], w, ec, Fq)
+
+
+def scalar_mult_gls(c, p1: JacobianPoint, ec=default_ec_twist, w: int = 4) -> JacobianPoint:
+    """
+    c * P for P in G2 with the 4-dimensional GLS decomposition over
+    ψ, ψ^2, ψ^3: quarter-length scalars sharing one chain of doublings.
+    """
+    tables = [_odd_multiples(p1, w, ec, Fq2)]
+    for i in range(3):
+        tables.append([gls_endomorphism(t) for t in tables[-1]])
+    return _straus_wnaf(tables, gls_decompose(c), w, ec, Fq2)
+
+
+def _jacobian_eq(p1: JacobianPoint, p2: JacobianPoint) -> bool:
+    # equality without converting to affine: X1 Z2^2 = X2 Z1^2, Y1 Z2^3 = Y2 Z1^3
+    if p1.infinity or p2.infinity:
+        return p1.infinity == p2.infinity
+    z1z1, z2z2 = p1.z * p1.z, p2.z * p2.z
+    return (
+        p1.x * z2z2 == p2.x * z1z1
+        and p1.y * z2z2 * p2.z == p2.y * z1z1 * p1.z
+    )
+
+
+def in_subgroup(p: JacobianPoint) -> bool:
+    """
+    Membership of a point on the curve in the order n subgroup.  Instead of
+    checking n * P = 0, BLS12-381 uses the endomorphism tests of
+    https://eprint.iacr.org/2021/1130.pdf:
+        G1: φ^2(P) = -x^2 P (φ^2 acts on G1 as λ^2 = -x^2)
+        G2: ψ(P) = x P
+    which cost two (G1) or one (G2) 64-bit multiplications.
+    """
+    if p.infinity:
+        return True
+    ec, x = p.ec, bls12381.x
+    if _is_bls_g1(p, ec):
+        xxp = scalar_mult_wnaf(x, scalar_mult_wnaf(x, p, ec, Fq), ec, Fq)
+        phi2 = glv_endomorphism(glv_endomorphism(p))
+        return _jacobian_eq(phi2, _negate_jacobian(xxp))
+    if _is_bls_g2(p, ec):
+        return _jacobian_eq(gls_endomorphism(p), scalar_mult_wnaf(x, p, ec, Fq2))
+    return scalar_mult_wnaf(ec.n, p, ec, p.FE).infinity
+
+
+def batch_check_valid(points: List[JacobianPoint]) -> None:
+    """
+    check_valid for many points, e.g. the public keys of an aggregate: the
+    curve equations are checked on affine coordinates from a single
+    inversion per field, the subgroup tests compare Jacobian points without
+    inversions.  Raises AssertionError like check_valid.
+    """
+    for FE in set(p.FE for p in points):
+        group = [p for p in points if p.FE is FE]
+        for a in batch_to_affine(group):
+            assert a.is_on_curve()
+        for p in group:
+            assert in_subgroup(p)
+
+
+def scalar_mult_jacobian(c, p1: JacobianPoint, ec=default_ec, FE=Fq) -> JacobianPoint:
+    """
+    Scalar multiplication behind JacobianPoint.__mul__.  BLS12-381 G1 and
+    G2 points use the GLV / GLS endomorphisms, which assume the point is
+    in the order n subgroup; anything else uses wNAF.  Multiples of n
+    also go through wNAF, so that P * n == infinity still tests subgroup
+    membership.  Use scalar_mult_wnaf for points that may lie outside of
+    the subgroup.
+    """
+    if isinstance(c, Fq):
+        c = c.value
+    if p1.infinity:
+        return JacobianPoint(FE.one(ec.q), FE.one(ec.q), FE.zero(ec.q), True, ec)
+    if c % ec.n != 0:
+        if _is_bls_g1(p1, ec):
+            return scalar_mult_glv(c, p1, ec)
+        if _is_bls_g2(p1, ec):
+            return scalar_mult_gls(c, p1, ec)
+    return scalar_mult_wnaf(c, p1, ec, FE)
+
+
+def msm_window_size(n: int) -> int:
+    """
+    Window size in bits of the Pippenger MSM for n points, about ln(n) + 2
+    (each window costs n bucket additions plus 2^c to combine the buckets).
+    """
+    if n < 32:
+        return 3
+    return n.bit_length() * 69 // 100 + 2
+
+
+def multi_scalar_mult(points: List[JacobianPoint], scalars, ec=None) -> JacobianPoint:
+    """
+    sum(c * p for p, c in zip(points, scalars)) with the bucket method
+    (Pippenger): the scalars are cut into c-bit windows, in every window
+    each point is added to the bucket of its digit and the buckets are
+    combined with a running sum as sum(d * bucket[d]), then the windows are
+    joined by c doublings each.  Scalars are ints or Fq; for BLS12-381
+    G1 / G2 points they are reduced mod n (the points are assumed to be
+    in the subgroup, as for p * c), otherwise negative scalars negate
+    their point.
+    """
+    FE = points[0].FE if len(points) > 0 else Fq
+    if ec is None:
+        ec = points[0].ec if len(points) > 0 else default_ec
+    pairs = []
+    for p, c in zip(points, scalars):
+        if isinstance(c, Fq):
+            c = c.value
+        if _is_bls_g1(p, ec) or _is_bls_g2(p, ec):
+            # order n subgroup points, as in scalar_mult_jacobian
+            c %= ec.n
+        elif c < 0:
+            p, c = p.negate(), -c
+        if c != 0 and not p.infinity:
+            pairs.append((p, c))
+    if len(pairs) == 0:
+        return G1Infinity(ec, FE)
+    # normalized once, so that the bucket additions are mixed additions
+    affine = batch_to_affine([p for p, _ in pairs])
+    pairs = [(a, c) for a, (_, c) in zip(affine, pairs)]
+
+    w = msm_window_size(len(pairs))
+    mask = (1 << w) - 1
+    nbits = max(c.bit_length() for _, c in pairs)
+    result = G1Infinity(ec, FE)
+    for shift in reversed(range(0, nbits, w)):
+        for i in range(w):
+            result = double_point_jacobian(result, ec, FE)
+        buckets = [None] * (mask + 1)
+        for p, c in pairs:
+            d = (c >> shift) & mask
+            if d:
+                if buckets[d] is None:
+                    buckets[d] = p.to_jacobian()
+                else:
+                    buckets[d] = add_points_mixed(buckets[d], p, ec, FE)
+        # sum(d * buckets[d]) as a sum of the running sums from the top
+        running = G1Infinity(ec, FE)
+        for d in range(mask, 0, -1):
+            if buckets[d] is not None:
+                running += buckets[d]
+            result += running
     return result
 
 
+class FixedBaseTable:
+    """
+    Windowed precomputation for a fixed base point B of order ec.n: row i
+    holds d * 2^(w*i) * B for d = 1 .. 2^w - 1, so c * B is one table
+    lookup and addition per w-bit digit of c, with no doublings.  The rows
+    are kept in affine coordinates for mixed additions.
+
+    With cache_path the rows are stored as affine coordinates and read
+    back instead of being recomputed, see _load for the checks.
+    """
+
+    def __init__(self, base: JacobianPoint, window: int = 8, ec=None, cache_path=None):
+        self.ec = base.ec if ec is None else ec
+        self.FE = base.FE
+        self.window = window
+        self.nwindows = (self.ec.n.bit_length() + window - 1) // window
+        self.rows = None
+        if cache_path is not None and os.path.exists(cache_path):
+            self.rows = self._load(cache_path, base)
+        if self.rows is None:
+            self.rows = self._build(base)
+            if cache_path is not None:
+                self._save(cache_path, base)
+
+    def _build(self, base, nwindows=None):
+        rows = []
+        b = base
+        for i in range(self.nwindows if nwindows is None else nwindows):
+            row = [b]
+            for d in range(2, 1 << self.window):
+                row.append(row[-1] + b)
+            rows.append(row)
+            b = row[-1] + b
+        flat = batch_to_affine([p for row in rows for p in row])
+        per_row = (1 << self.window) - 1
+        return [flat[i * per_row : (i + 1) * per_row] for i in range(len(rows))]
+
+    # cache file: magic, window and number of windows (u16 each), the
+    # compressed base point, sha256 of the body, then the rows as affine
+    # coordinates
+    _MAGIC = b"FBTABLE1"
+
+    def _header(self, base):
+        return (
+            self._MAGIC
+            + self.window.to_bytes(2, "big")
+            + self.nwindows.to_bytes(2, "big")
+            + point_to_bytes(base, self.ec, self.FE)
+        )
+
+    def _save(self, path, base):
+        body = b"".join(bytes(a.x) + bytes(a.y) for row in self.rows for a in row)
+        with open(path, "wb") as f:
+            f.write(self._header(base) + hash256(body) + body)
+
+    def _load(self, path, base):
+        """
+        The cached rows, or None if the file is not a table of this base,
+        window and curve, is corrupted, or its first row differs from a
+        recomputation.  The caller then rebuilds the table.
+        """
+        size = 48 * self.FE.extension
+        per_row = (1 << self.window) - 1
+        header = self._header(base)
+        with open(path, "rb") as f:
+            data = f.read()
+        body = data[len(header) + 32 :]
+        if (
+            data[: len(header)] != header
+            or len(body) != 2 * size * per_row * self.nwindows
+            or data[len(header) : len(header) + 32] != hash256(body)
+        ):
+            return None
+        rows = []
+        pos = 0
+        for i in range(self.nwindows):
+            row = []
+            for d in range(per_row):
+                x = self.FE.from_bytes(body[pos : pos + size], self.ec.q)
+                y = self.FE.from_bytes(body[pos + size : pos + 2 * size], self.ec.q)
+                row.append(AffinePoint(x, y, False, self.ec))
+                pos += 2 * size
+            rows.append(row)
+        if rows[0] != self._build(base, 1)[0]:
+            return None
+        return rows
+
+    def mul(self, c) -> JacobianPoint:
+        if isinstance(c, Fq):
+            c = c.value
+        c %= self.ec.n
+        mask = (1 << self.window) - 1
+        result = G1Infinity(self.ec, self.FE)
+        for row in self.rows:
+            if c == 0:
+                break
+            d = c & mask
+            if d:
+                result = add_points_mixed(result, row[d - 1], self.ec, self.FE)
+            c >>= self.window
+        return result
+
+    def mul_many(self, scalars) -> List[JacobianPoint]:
+        return [self.mul(c) for c in scalars]
+
+
+# lazily built tables of G1Generator() and G2Generator()
+_fixed_base_tables = {}
+
+
+def fixed_base_table(g2: bool = False) -> FixedBaseTable:
+    """
+    Cached FixedBaseTable of G1Generator() (or G2Generator()), built on
+    first use.  If the FIXED_BASE_CACHE environment variable names a
+    directory, the tables are also kept there across processes.
+    """
+    name = "g2" if g2 else "g1"
+    if name not in _fixed_base_tables:
+        base = G2Generator() if g2 else G1Generator()
+        cache_dir = os.environ.get("FIXED_BASE_CACHE")
+        cache_path = None
+        if cache_dir:
+            cache_path = os.path.join(cache_dir, "%s_table_w8.bin" % name)
+        _fixed_base_tables[name] = FixedBaseTable(base, 8, cache_path=cache_path)
+    return _fixed_base_tables[name]
+
+
+def fixed_base_mul(c, g2: bool = False) -> JacobianPoint:
+    """
+    c * G1Generator() (or c * G2Generator()) through the fixed-base table.
+    """
+    return fixed_base_table(g2).mul(c)
+
+
+def fixed_base_mul_many(scalars, g2: bool = False) -> List[JacobianPoint]:
+    """
+    [c * G1Generator() for c in scalars] (or G2Generator()), e.g. for
+    generating an SRS or deriving many keys.
+    """
+    return fixed_base_table(g2).mul_many(scalars)
+
+
 def G1Generator(ec=default_ec) -> JacobianPoint:
     return AffinePoint(ec.gx, ec.gy, False, ec).to_jacobian()
 
@@ -0,0 +1,107 @@
+# FFT over vectors of curve points (EC-FFT): the same butterflies as the
+# scalar FFT in fft.py, with point additions and multiplications of a point
+# by a twiddle factor.  The scalars live in the group order field, so
+# modulus is default_ec.n and root_of_unity a root of unity mod n.
+
+from ec import G1Infinity
+
+
+def _expand_root_of_unity(root_of_unity, modulus):
+    # [1, w, w^2, ..., 1]
+    rootz = [1, root_of_unity % modulus]
+    while rootz[-1] != 1:
+        rootz.append((rootz[-1] * root_of_unity) % modulus)
+    return rootz
+
+
+def _ec_fft(vals, roots_of_unity):
+    if len(vals) == 1:
+        return vals
+    L = _ec_fft(vals[::2], roots_of_unity[::2])
+    R = _ec_fft(vals[1::2], roots_of_unity[::2])
+    o = [None] * len(vals)
+    for i, (x, y) in enumerate(zip(L, R)):
+        # twiddle 1 needs no multiplication
+        y_times_root = y if i == 0 else y * roots_of_unity[i]
+        o[i] = x + y_times_root
+        o[i + len(L)] = x + y_times_root.negate()
+    return o
+
+
+def ec_fft(vals, modulus, root_of_unity, inv=False):
+    # vals are JacobianPoints, padded with the point at infinity up to the
+    # order of root_of_unity (a power of 2)
+    rootz = _expand_root_of_unity(root_of_unity, modulus)
+    n = len(rootz) - 1
+    assert n & (n - 1) == 0 and len(vals) <= n
+    if len(vals) < n:
+        zero = G1Infinity() if len(vals) == 0 else G1Infinity(vals[0].ec, vals[0].FE)
+        vals = vals + [zero] * (n - len(vals))
+    if inv:
+        invlen = pow(n, modulus - 2, modulus)
+        return [x * invlen for x in _ec_fft(vals, rootz[:0:-1])]
+    return _ec_fft(vals, rootz[:-1])
+
+
+def lagrange_setup(setup, modulus, root_of_unity, shift=1):
+    # Lagrange form [L_0(s)], ..., [L_{n-1}(s)] of the monomial setup
+    # [1], [s], [s^2], ... for the domain shift * w^i, i < n, n the order
+    # of w = root_of_unity.  As L_i(X) = 1/n sum_j (X / (shift * w^i))^j,
+    # it is the inverse EC-FFT of the [s^j] scaled by shift^-j.
+    n = len(_expand_root_of_unity(root_of_unity, modulus)) - 1
+    assert len(setup) >= n
+    setup = setup[:n]
+    shift = shift % modulus
+    if shift != 1:
+        inv_shift = pow(shift, modulus - 2, modulus)
+        setup = [p * pow(inv_shift, j, modulus) for j, p in enumerate(setup)]
+    return ec_fft(setup, modulus, root_of_unity, inv=True)
+
+
+def _dft(xs, modulus, root_of_unity):
+    n = len(xs)
+    return [sum(x * pow(root_of_unity, i * j, modulus) for j, x in enumerate(xs)) % modulus
+            for i in range(n)]
+
+
+def test_ec_fft():
+    import random
+    from ec import G1Generator, default_ec
+
+    modulus = default_ec.n
+    n = 8
+    root = pow(7, (modulus - 1) // n, modulus)
+    g = G1Generator()
+    xs = [random.randint(0, modulus - 1) for i in range(n)]
+    points = [g * x for x in xs]
+    # the transform commutes with x -> x * G
+    o = ec_fft(points, modulus, root)
+    assert o == [g * y for y in _dft(xs, modulus, root)]
+    assert ec_fft(o, modulus, root, inv=True) == points
+    print("test_ec_fft passed")
+
+
+def test_lagrange_setup():
+    import random
+    from ec import G1Generator, default_ec
+
+    modulus = default_ec.n
+    n = 8
+    root = pow(7, (modulus - 1) // n, modulus)
+    g = G1Generator()
+    s = random.randint(0, modulus - 1)
+    setup = [g * pow(s, i, modulus) for i in range(n)]
+    for shift in [1, 5]:
+        lsetup = lagrange_setup(setup, modulus, root, shift)
+        # L_i(s) = w_i (s^n - h^n) / (n h^n (s - w_i)), w_i = h w^i
+        hn = pow(shift, n, modulus)
+        for i in range(n):
+            w = shift * pow(root, i, modulus) % modulus
+            l = w * (pow(s, n, modulus) - hn) * pow(n * hn * (s - w), modulus - 2, modulus)
+            assert lsetup[i] == g * (l % modulus)
+    print("test_lagrange_setup passed")
+
+
+if __name__ == "__main__":
+    test_ec_fft()
+    test_lagrange_setup()
@@ -1,3 +1,4 @@
+from ec import multi_scalar_mult
 from fields import Fq
 from functools import reduce
 
@@ -12,11 +13,11 @@ def eval_poly_in_eval_form(x, mus, roots):
     return (x ** nroots - Fq(order, 1)) / nroots * fq_sum([mu * root / (x - root) for mu, root in zip(mus, roots)])
 
 def commitment_in_eval_form(lagrange_setup, mus):
-    return sum(mu * l for mu, l in zip(mus, lagrange_setup))
+    return multi_scalar_mult(lagrange_setup, mus)
 
 def single_proof_in_eval_form(lagrange_setup, mus, roots, x, y):
     # Obtain the proof polynomial evaluated at a trusted setup secret
-    return sum([(mu - y) / (root - x) * l for mu, root, l in zip(mus, roots, lagrange_setup)])
+    return multi_scalar_mult(lagrange_setup, [(mu - y) / (root - x) for mu, root in zip(mus, roots)])
 
 def reverse_bit(x, nbits):
     y = 0
@@ -1,4 +1,4 @@
-from ec import G1Generator, G2Generator, JacobianPoint, default_ec
+from ec import JacobianPoint, default_ec, fixed_base_mul
 from hkdf import extract_expand
 from private_key import PrivateKey
 from util import hash256
@@ -61,7 +61,7 @@ def derive_child_g1_unhardened(parent_pk: JacobianPoint, index: int) -> Jacobian
     at the specified index. WARNING: this key is not as secure as a hardened key.
     """
     h = hash256(bytes(parent_pk) + index.to_bytes(4, "big"))
-    return parent_pk + PrivateKey.from_bytes(h).value * G1Generator()
+    return parent_pk + fixed_base_mul(PrivateKey.from_bytes(h).value)
 
 
 def derive_child_g2_unhardened(parent_pk: JacobianPoint, index: int) -> JacobianPoint:
@@ -70,7 +70,7 @@ def derive_child_g2_unhardened(parent_pk: JacobianPoint, index: int) -> Jacobian
     at the specified index. WARNING: this key is not as secure as a hardened key.
     """
     h = hash256(bytes(parent_pk) + index.to_bytes(4, "big"))
-    return parent_pk + PrivateKey.from_bytes(h) * G2Generator()
+    return parent_pk + fixed_base_mul(PrivateKey.from_bytes(h).value, g2=True)
 
 
 """
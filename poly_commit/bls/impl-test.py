@@ -1,9 +1,9 @@
 import hashlib
 from copy import deepcopy
-from secrets import token_bytes
+from secrets import randbelow, token_bytes
 
 from ec import (G1FromBytes, G1Generator, G1Infinity, G2FromBytes, G2Generator,
-                G2Infinity, JacobianPoint, default_ec, default_ec_twist,
+                G2Infinity, JacobianPoint, default_ec, default_ec_twist, in_subgroup,
                 sign_Fq2, twist, untwist, y_for_x)
 from fields import Fq, Fq2, Fq6, Fq12
 from hash_to_field import expand_message_xmd
@@ -199,6 +199,20 @@ def test_ec():
     assert (g_j * 2).to_affine() == g.to_affine() * 2
     assert (g2_j + g2_j2).to_affine() == g2.to_affine() * 3
 
+    # P * n is only infinity for points of the subgroup
+    assert (g * default_ec.n).infinity and (g2 * default_ec.n).infinity
+    x = 1
+    while True:
+        try:
+            y = y_for_x(x)
+            break
+        except ValueError:
+            x += 1
+    p = JacobianPoint(Fq(q, x), y, Fq.one(q), False, default_ec)
+    assert p.is_on_curve() and not in_subgroup(p)
+    assert not (p * default_ec.n).infinity
+    assert not (p * (2 * default_ec.n)).infinity
+
 
 def test_edge_case_sign_Fq2():
     q = default_ec.q
@@ -213,6 +227,21 @@ def test_edge_case_sign_Fq2():
     assert sign_Fq2(test_case_3) != sign_Fq2(test_case_4)
 
 
+def test_serialization_round_trip():
+    # both signs of y, and the point at infinity, of G1 and G2
+    for i in range(10):
+        g1 = G1Generator() * (randbelow(default_ec.n - 1) + 1)
+        g2 = G2Generator() * (randbelow(default_ec.n - 1) + 1)
+        for p in [g1, g1.negate()]:
+            assert G1FromBytes(bytes(p)) == p
+        for p in [g2, g2.negate()]:
+            assert G2FromBytes(bytes(p)) == p
+    for p, from_bytes in [(G1Infinity(), G1FromBytes), (G2Infinity(), G2FromBytes)]:
+        b = bytes(p)
+        assert b[0] == 0xC0 and not any(b[1:])
+        assert from_bytes(b).infinity
+
+
 def test_xmd():
     msg = token_bytes(48)
     dst = token_bytes(16)
@@ -654,6 +683,7 @@ test_ec()
 test_xmd()
 test_swu()
 test_edge_case_sign_Fq2()
+test_serialization_round_trip()
 test_elements()
 test_chia_vectors_1()
 test_chia_vectors_2()
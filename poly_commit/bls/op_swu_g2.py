@@ -18,7 +18,7 @@
 # limitations under the License.
 
 from bls12381 import h_eff, q
-from ec import JacobianPoint, default_ec_twist, eval_iso
+from ec import JacobianPoint, default_ec_twist, eval_iso, scalar_mult_wnaf
 from fields import Fq, Fq2, roots_of_unity
 from hash_to_field import Hp2
 
@@ -203,7 +203,8 @@ def opt_swu2_map(t: Fq2, t2: Fq2 = None) -> JacobianPoint:
     if t2 is not None:
         Pp2 = iso3(osswu2_help(t2))
         Pp = Pp + Pp2
-    return Pp * h_eff
+    # Pp is not in G2 yet, so the endomorphism multiplication does not apply
+    return scalar_mult_wnaf(h_eff, Pp, default_ec_twist, Fq2)
 
 
 #
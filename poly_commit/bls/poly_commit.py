@@ -1,8 +1,9 @@
 from ec import (G1FromBytes, G1Generator, G1Infinity, G2FromBytes, G2Generator,
                 G2Infinity, JacobianPoint, default_ec, default_ec_twist,
+                fixed_base_mul, fixed_base_mul_many, multi_scalar_mult,
                 sign_Fq2, twist, untwist, y_for_x)
 from fields import Fq
-from pairing import ate_pairing
+from pairing import pairing_product_is_one
 
 g1 = G1Generator()
 
@@ -41,6 +42,15 @@ def poly_div(num, den):
     r.reverse()
     return r, tmp[0:len(den)-1]
 
+def poly_div_linear(num, z):
+    # synthetic division of num by (x - z), the remainder is num(z)
+    r = [None] * (len(num) - 1)
+    carry = Fq(num[0].Q, 0)
+    for i in range(len(num) - 1, 0, -1):
+        carry = num[i] + carry * z
+        r[i - 1] = carry
+    return r, [num[0] + carry * z]
+
 def poly_interp(vec, x = None):
     # compute the coefficient of the vector using Lagrange interpolation
     q = vec[0].Q
@@ -61,9 +71,9 @@ def poly_interp(vec, x = None):
 def get_single_proof(coeffs, sec_vec, z, y):
     px = coeffs[:]
     px[0] = px[0] - y
-    qx, rem = poly_div(px, [-z, Fq(order, 1)])
+    qx, rem = poly_div_linear(px, z)
     assert rem == [Fq(order, 0)]
-    qs = sum(s * c for s, c in zip(sec_vec[0:len(qx)], qx))
+    qs = multi_scalar_mult(sec_vec[0:len(qx)], qx)
     return qs
 
 def proof_example():
@@ -76,21 +86,19 @@ def proof_example():
     coeffs = poly_interp(vec)
 
     # s^i secrec vector, which is available to everybody (and cannot infer s)
-    sec_vec = [g1 * (secret ** i) for i in range(len(vec))]
-    commit = sum(s * c for s, c in zip(sec_vec, coeffs))
+    sec_vec = fixed_base_mul_many([secret ** i for i in range(len(vec))])
+    commit = multi_scalar_mult(sec_vec, coeffs)
     print("commitment is", commit)
 
     z = 1
     # proof
     qs = get_single_proof(coeffs, sec_vec, Fq(order, z), vec[z])
     sz2 = g2 * secret + (g2 * z).negate()
-    pair0 = ate_pairing(qs, sz2)
-    print(pair0)
 
-    cy = commit + (g1 * vec[z]).negate()
-    pair1 = ate_pairing(cy, g2)
-    print(pair1)
-    assert pair0 == pair1
+    # e(qs, [s - z]) == e(c - [y], [1])
+    cy = commit + fixed_base_mul(vec[z]).negate()
+    assert pairing_product_is_one([(qs, sz2), (cy.negate(), g2)])
+    print("proof verified")
 
 if __name__ == "__main__":
     proof_example()
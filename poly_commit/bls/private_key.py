@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from ec import G1Generator, default_ec
+from ec import default_ec, fixed_base_mul
 from hkdf import extract_expand
 
 
@@ -33,7 +33,7 @@ class PrivateKey:
         return PrivateKey(n % default_ec.n)
 
     def get_g1(self):
-        return self.value * G1Generator()
+        return fixed_base_mul(self.value)
 
     def sign(self, m):
         pass
@@ -1,7 +1,8 @@
 
 from ec import (G1FromBytes, G1Generator, G1Infinity, G2FromBytes, G2Generator,
                 G2Infinity, JacobianPoint, default_ec, default_ec_twist,
-                sign_Fq2, twist, untwist, y_for_x)
+                fixed_base_mul_many, sign_Fq2, twist, untwist, y_for_x)
+from ec_fft import lagrange_setup
 from fields import Fq
 from pairing import ate_pairing
 from poly_commit import poly_interp, get_single_proof
@@ -18,9 +19,14 @@ nroots = 16
 primitive = 7
 roots = [Fq(order, primitive) ** (2 * i * (order - 1) // nroots)  for i in range(nroots // 2)]
 roots += [Fq(order, primitive) ** ((2 * i + 1) * (order - 1) // nroots)  for i in range(nroots // 2)]
-sec_roots = [(secret ** nroots - Fq(order, 1)) * w / Fq(order, nroots) / (secret - w) * g1 for w in roots]
 phi = Fq(order, primitive) ** ((order - 1) // nroots) # w^1
-sec_roots2 = [((secret / phi) ** nroots - Fq(order, 1)) * w / Fq(order, nroots) / ((secret / phi) - w) * g1 for w in roots]
+# Lagrange setup of the natural order domain with an EC-FFT, then in the order of roots
+sec_vec = fixed_base_mul_many([secret ** i for i in range(nroots)])
+lsetup = lagrange_setup(sec_vec, order, phi.value)
+sec_roots = lsetup[0::2] + lsetup[1::2]
+# [L_w(s / phi)] is the Lagrange setup of the coset phi * roots
+lsetup2 = lagrange_setup(sec_vec, order, phi.value, phi.value)
+sec_roots2 = lsetup2[0::2] + lsetup2[1::2]
 
 # elements in the vector
 vec = [51234, 28374, 62734, 19823, 571763, 83746, 198384, 827512]
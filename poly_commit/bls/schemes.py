@@ -1,11 +1,10 @@
 from typing import List
 
-from ec import G1Generator, JacobianPoint, default_ec
-from fields import Fq12
+from ec import G1Generator, JacobianPoint, batch_check_valid
 from hd_keys import (derive_child_g1_unhardened, derive_child_sk,
                      derive_child_sk_unhardened, key_gen)
 from op_swu_g2 import g2_map
-from pairing import ate_pairing_multi
+from pairing import pairing_product_is_one
 from private_key import PrivateKey
 
 basic_scheme_dst = b"BLS_SIG_BLS12381G2_XMD:SHA-256_SSWU_RO_NUL_"
@@ -27,18 +26,15 @@ def core_verify_mpl(
     except AssertionError:
         return False
     q = g2_map(message, dst)
-    one = Fq12.one(default_ec.q)
-    pairing_result = ate_pairing_multi([pk, G1Generator().negate()], [q, signature])
-    return pairing_result == one
+    return pairing_product_is_one([(pk, q), (G1Generator().negate(), signature)])
 
 
 def core_aggregate_mpl(signatures: List[JacobianPoint]) -> JacobianPoint:
     if len(signatures) < 1:
         raise ValueError("Must aggregate at least 1 signature")
+    batch_check_valid(signatures)
     aggregate = signatures[0]
-    aggregate.check_valid()
     for signature in signatures[1:]:
-        signature.check_valid()
         aggregate += signature
     return aggregate
 
@@ -49,14 +45,13 @@ def core_aggregate_verify(
     if len(pks) != len(ms) or len(pks) < 1:
         return False
     try:
-        signature.check_valid()
+        batch_check_valid(pks + [signature])
         qs = [signature]
         ps = [G1Generator().negate()]
         for i in range(len(pks)):
-            pks[i].check_valid()
             qs.append(g2_map(ms[i], dst))
             ps.append(pks[i])
-        return Fq12.one(default_ec.q) == ate_pairing_multi(ps, qs)
+        return pairing_product_is_one(list(zip(ps, qs)))
 
     except AssertionError:
         return False
@@ -179,9 +174,7 @@ class PopSchemeMPL:
             proof.check_valid()
             pk.check_valid()
             q = g2_map(bytes(pk), pop_scheme_pop_dst)
-            one = Fq12.one(default_ec.q)
-            pairing_result = ate_pairing_multi([pk, G1Generator().negate()], [q, proof])
-            return pairing_result == one
+            return pairing_product_is_one([(pk, q), (G1Generator().negate(), proof)])
         except AssertionError:
             return False
 
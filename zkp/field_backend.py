@@ -0,0 +1,53 @@
+# Modular exponentiation and inversion for the prime field code.
+#
+# "gmpy2" uses gmpy2.powmod / gmpy2.invert (several times faster than
+# Python's pow for 256-bit moduli), "python" is the plain int fallback.
+# The default is gmpy2 when it is installed; the FIELD_BACKEND environment
+# variable or an explicit name overrides it.  Requesting gmpy2 without it
+# installed falls back to Python.  Results are always Python ints.
+import os
+
+try:
+    import gmpy2
+except ImportError:
+    gmpy2 = None
+
+
+# Modular inverse using the extended Euclidean algorithm, 0 has inverse 0
+def _py_invert(a, modulus):
+    a %= modulus
+    if a == 0:
+        return 0
+    lm, hm = 1, 0
+    low, high = a, modulus
+    while low > 1:
+        r = high//low
+        nm, new = hm-lm*r, high-low*r
+        lm, low, hm, high = nm, new, lm, low
+    return lm % modulus
+
+
+# name -> (powmod(x, e, modulus), invert(a, modulus))
+BACKENDS = {"python": (pow, _py_invert)}
+
+if gmpy2 is not None:
+    def _gmpy2_powmod(x, e, modulus):
+        return int(gmpy2.powmod(x, e, modulus))
+
+    def _gmpy2_invert(a, modulus):
+        a %= modulus
+        return int(gmpy2.invert(a, modulus)) if a else 0
+
+    BACKENDS["gmpy2"] = (_gmpy2_powmod, _gmpy2_invert)
+
+
+def backend_name(name=None):
+    if name is None:
+        name = os.environ.get("FIELD_BACKEND", "gmpy2" if gmpy2 is not None else "python")
+    assert name in ("python", "gmpy2"), "unknown field backend " + name
+    return name if name in BACKENDS else "python"
+
+
+# (powmod, invert) of the selected backend
+def get_backend(name=None):
+    return BACKENDS[backend_name(name)]
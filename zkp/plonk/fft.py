@@ -1,3 +1,12 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_all_start_methods, get_context
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 def _simple_ft(vals, modulus, roots_of_unity):
     L = len(roots_of_unity)
     o = []
@@ -28,19 +37,558 @@ def expand_root_of_unity(root_of_unity, modulus):
         rootz.append((rootz[-1] * root_of_unity) % modulus)
     return rootz
 
-def fft(vals, modulus, root_of_unity, inv=False):
+# Bit-reversal permutation of range(n), n must be a power of 2
+def _bit_reverse_indices(n):
+    rev = [0]
+    while len(rev) < n:
+        rev = [x * 2 for x in rev] + [x * 2 + 1 for x in rev]
+    return rev
+
+# Cached per (modulus, root_of_unity): the expanded roots, the bit-reversal
+# permutation and the per-level twiddles of the forward and inverse NTTs.
+# Level k holds w^(j * n / 2^(k+1)) for j < 2^k, so the butterflies read
+# their twiddles sequentially instead of striding through the root table.
+_fft_tables = {}
+
+def _get_fft_tables(modulus, root_of_unity):
+    key = (modulus, root_of_unity)
+    tables = _fft_tables.get(key)
+    if tables is not None:
+        return tables
     rootz = expand_root_of_unity(root_of_unity, modulus)
+    n = len(rootz) - 1
+    if n & (n - 1) == 0:
+        fwd = []
+        inv = []
+        half = 1
+        while half < n:
+            stride = n // (2 * half)
+            fwd.append(rootz[0:n:stride][:half])
+            inv.append(rootz[n:0:-stride][:half])
+            half *= 2
+        tables = (rootz, _bit_reverse_indices(n), fwd, inv)
+    else:
+        # Not a power of 2, only the recursive _fft can handle it
+        tables = (rootz, None, None, None)
+    _fft_tables[key] = tables
+    return tables
+
+# Iterative in-place radix-2 NTT: permute into bit-reversed order, then
+# run log2(n) levels of Cooley-Tukey butterflies over a single buffer.
+# If given, vals[i] is multiplied by scale[i] while being permuted.
+def _ntt(vals, modulus, rev, twiddles, scale=None):
+    if scale is None:
+        o = [vals[i] for i in rev]
+    else:
+        o = [vals[i] * scale[i] % modulus for i in rev]
+    n = len(o)
+    half = 1
+    for tw in twiddles:
+        size = half * 2
+        for start in range(0, n, size):
+            for j in range(half):
+                i = start + j
+                x = o[i]
+                y = o[i + half] * tw[j] % modulus
+                o[i] = (x + y) % modulus
+                o[i + half] = (x - y) % modulus
+        half = size
+    if n == 1:
+        o[0] %= modulus
+    return o
+
+def fft(vals, modulus, root_of_unity, inv=False):
+    n = _np_order(modulus, root_of_unity)
+    if n:
+        if inv:
+            return _np_ntt(vals, modulus, pow(root_of_unity, n-1, modulus),
+                           post=pow(n, modulus-2, modulus)).tolist()
+        return _np_ntt(vals, modulus, root_of_unity).tolist()
+    rootz, rev, fwd_tw, inv_tw = _get_fft_tables(modulus, root_of_unity)
     # Fill in vals with zeroes if needed
     if len(rootz) > len(vals) + 1:
         vals = vals + [0] * (len(rootz) - len(vals) - 1)
+    if rev is not None and _use_four_step(len(vals)):
+        return four_step_fft(vals, modulus, root_of_unity, inv)
     if inv:
         # Inverse FFT
         invlen = pow(len(vals), modulus-2, modulus)
-        return [(x*invlen) % modulus for x in
-                _fft(vals, modulus, rootz[:0:-1])]
+        if rev is None:
+            o = _fft(vals, modulus, rootz[:0:-1])
+        else:
+            o = _ntt(vals, modulus, rev, inv_tw)
+        return [(x*invlen) % modulus for x in o]
     else:
         # Regular FFT
-        return _fft(vals, modulus, rootz[:-1])
+        if rev is None:
+            return _fft(vals, modulus, rootz[:-1])
+        return _ntt(vals, modulus, rev, fwd_tw)
+
+# Cached [c * factor^i for i < n], the scaling vectors of coset transforms
+_coset_scales = {}
+
+def _get_coset_scale(modulus, factor, n, c=1):
+    key = (modulus, factor, n, c)
+    scale = _coset_scales.get(key)
+    if scale is None:
+        scale = [c % modulus]
+        for i in range(1, n):
+            scale.append(scale[-1] * factor % modulus)
+        _coset_scales[key] = scale
+    return scale
+
+# Evaluates the polynomial with coefficients vals over the coset
+# shift * <root_of_unity>. The shift powers are applied while the input is
+# permuted for the first butterfly level, so there is no separate pass.
+def coset_fft(vals, modulus, root_of_unity, shift):
+    n = _np_order(modulus, root_of_unity)
+    if n:
+        pre = _get_np_coset_scale(modulus, shift % modulus, n)
+        return _np_ntt(vals, modulus, root_of_unity, pre=pre).tolist()
+    rootz, rev, fwd_tw, _ = _get_fft_tables(modulus, root_of_unity)
+    n = len(rootz) - 1
+    if n > len(vals):
+        vals = vals + [0] * (n - len(vals))
+    scale = _get_coset_scale(modulus, shift % modulus, n)
+    if rev is None or _use_four_step(n):
+        return fft([v * s % modulus for v, s in zip(vals, scale)], modulus, root_of_unity)
+    return _ntt(vals, modulus, rev, fwd_tw, scale)
+
+# Inverse of coset_fft: recovers the coefficients from the evaluations over
+# shift * <root_of_unity>. The 1/n normalisation and the shift^-i powers
+# are applied together in one pass over the output.
+def coset_ifft(vals, modulus, root_of_unity, shift):
+    n = _np_order(modulus, root_of_unity)
+    if n:
+        post = _get_np_coset_scale(modulus, pow(shift, modulus-2, modulus), n,
+                                   pow(n, modulus-2, modulus))
+        return _np_ntt(vals, modulus, pow(root_of_unity, n-1, modulus), post=post).tolist()
+    rootz, rev, _, inv_tw = _get_fft_tables(modulus, root_of_unity)
+    n = len(rootz) - 1
+    if n > len(vals):
+        vals = vals + [0] * (n - len(vals))
+    scale = _get_coset_scale(modulus, pow(shift, modulus-2, modulus), n,
+                             pow(n, modulus-2, modulus))
+    if rev is None:
+        o = _fft(vals, modulus, rootz[:0:-1])
+    elif _use_four_step(n):
+        o = four_step_fft(vals, modulus, rootz[-2])
+    else:
+        o = _ntt(vals, modulus, rev, inv_tw)
+    return [x * s % modulus for x, s in zip(o, scale)]
+
+# Low-degree extension: given the evaluations of a polynomial over the
+# subgroup of order len(evals), returns its evaluations over the coset
+# coset_shift * <root_of_unity>, where root_of_unity has order
+# len(evals) * blowup. The 1/n of the interpolation and the shift powers are
+# folded into a single scaling of the coefficients.
+def lde(evals, modulus, root_of_unity, blowup, coset_shift=1):
+    small_root = pow(root_of_unity, blowup, modulus)
+    n = len(evals)
+    if _np_order(modulus, root_of_unity) == n * blowup:
+        coeffs = _np_ntt(evals, modulus, pow(small_root, n-1, modulus))
+        coeffs = np.concatenate((coeffs, np.zeros(n * (blowup - 1), dtype=np.uint64)))
+        pre = _get_np_coset_scale(modulus, coset_shift % modulus, n * blowup,
+                                  pow(n, modulus-2, modulus))
+        return _np_ntt(coeffs, modulus, root_of_unity, pre=pre).tolist()
+    rootz, rev, _, inv_tw = _get_fft_tables(modulus, small_root)
+    n = len(rootz) - 1
+    assert len(evals) == n
+    big_rootz, big_rev, big_tw, _ = _get_fft_tables(modulus, root_of_unity)
+    assert len(big_rootz) - 1 == n * blowup
+    if rev is None or big_rev is None:
+        return coset_fft(fft(evals, modulus, small_root, inv=True), modulus,
+                         root_of_unity, coset_shift)
+    # coefficients times n
+    coeffs = _ntt(evals, modulus, rev, inv_tw)
+    coeffs += [0] * (n * (blowup - 1))
+    scale = _get_coset_scale(modulus, coset_shift % modulus, n * blowup,
+                             pow(n, modulus-2, modulus))
+    if _use_four_step(n * blowup):
+        return fft([v * s % modulus for v, s in zip(coeffs, scale)], modulus, root_of_unity)
+    return _ntt(coeffs, modulus, big_rev, big_tw, scale)
+
+# NumPy backend for primes below 2^64: the butterflies run level by level
+# over uint64 arrays. Products are reduced with % for primes below 2^32 and
+# with the 2^64 = 2^32 - 1 (mod p) identity for the Goldilocks prime; other
+# moduli keep using Python ints.
+GOLDILOCKS = 2**64 - 2**32 + 1
+NUMPY_THRESHOLD = 64
+
+def _use_numpy(modulus, n):
+    return (np is not None and n >= NUMPY_THRESHOLD
+            and (modulus < 2**32 or modulus == GOLDILOCKS))
+
+# Order of root_of_unity if it is a power of 2, else 0
+def _pow2_order(modulus, root_of_unity):
+    n, x = 1, root_of_unity % modulus
+    while x != 1:
+        if n > modulus:
+            return 0
+        n, x = n * 2, x * x % modulus
+    return n
+
+# Transform size if a transform over root_of_unity should run on NumPy, else 0
+def _np_order(modulus, root_of_unity):
+    if not _use_numpy(modulus, NUMPY_THRESHOLD):
+        return 0
+    n = _pow2_order(modulus, root_of_unity)
+    return n if n >= NUMPY_THRESHOLD else 0
+
+# uint64 array of vals reduced mod modulus, zero-padded to length n
+def _np_array(vals, modulus, n=0):
+    if not isinstance(vals, np.ndarray):
+        vals = np.array([x % modulus for x in vals], dtype=np.uint64)
+    if len(vals) < n:
+        vals = np.concatenate((vals, np.zeros(n - len(vals), dtype=np.uint64)))
+    return vals
+
+# min(s, s - p) reduces s < 2p to [0, p): s - p wraps above s when s < p
+def _np_reduce_once(s, modulus):
+    return np.minimum(s, s - np.uint64(modulus), out=s)
+
+def _np_add(x, y, modulus):
+    s = x + y
+    if modulus >= 2**63:
+        # wrapped around 2^64, add back 2^64 mod p
+        s = np.where(s < x, s + np.uint64(2**64 - modulus), s)
+    return _np_reduce_once(s, modulus)
+
+def _np_sub(x, y, modulus):
+    # x - y wraps to 2^64 + x - y when x < y, adding p wraps it back
+    d = x - y
+    if modulus >= 2**63:
+        return np.where(x < y, d + np.uint64(modulus), d)
+    return np.minimum(d, d + np.uint64(modulus), out=d)
+
+def _np_mul(x, y, modulus):
+    if modulus < 2**32:
+        return x * y % np.uint64(modulus)
+    assert modulus == GOLDILOCKS
+    m32 = np.uint64(0xffffffff)
+    s32 = np.uint64(32)
+    # 128-bit product hi * 2^64 + lo from 32-bit limbs
+    x0, x1 = x & m32, x >> s32
+    y0, y1 = y & m32, y >> s32
+    p01, p10 = x0 * y1, x1 * y0
+    mid = ((x0 * y0) >> s32) + (p01 & m32) + (p10 & m32)
+    # uint64 products wrap, so x * y is the low word
+    lo = x * y
+    hi = x1 * y1 + (p01 >> s32) + (p10 >> s32) + (mid >> s32)
+    # lo + hi_lo * 2^64 + hi_hi * 2^96 = lo + hi_lo * (2^32 - 1) - hi_hi
+    hh = hi >> s32
+    t0 = lo - hh
+    t0 -= (lo < hh) * m32
+    t1 = (hi & m32) * m32
+    r = t0 + t1
+    r += (r < t1) * m32
+    return _np_reduce_once(r, modulus)
+
+# [c * base^i for i < n] as a uint64 array, doubling the length each step
+def _np_powers(base, n, modulus, c=1):
+    o = np.array([c % modulus], dtype=np.uint64)
+    while len(o) < n:
+        o = np.concatenate((o, _np_mul(o, np.uint64(pow(base, len(o), modulus)), modulus)))
+    return o[:n]
+
+# Cached per (modulus, root_of_unity): bit-reversal permutation and the
+# powers root^j, j < n/2, that every level slices its twiddles from
+_np_fft_tables = {}
+
+def _get_np_fft_tables(modulus, root_of_unity):
+    key = (modulus, root_of_unity)
+    tables = _np_fft_tables.get(key)
+    if tables is None:
+        n = _pow2_order(modulus, root_of_unity)
+        bits = n.bit_length() - 1
+        idx = np.arange(n, dtype=np.int64)
+        rev = np.zeros(n, dtype=np.int64)
+        for b in range(bits):
+            rev |= ((idx >> b) & 1) << (bits - 1 - b)
+        tables = (rev, _np_powers(root_of_unity, n // 2, modulus))
+        _np_fft_tables[key] = tables
+    return tables
+
+_np_coset_scales = {}
+
+def _get_np_coset_scale(modulus, factor, n, c=1):
+    key = (modulus, factor, n, c)
+    scale = _np_coset_scales.get(key)
+    if scale is None:
+        scale = _np_powers(factor, n, modulus, c)
+        _np_coset_scales[key] = scale
+    return scale
+
+# Radix-2 NTT over a uint64 array; pre and post are optional scalings
+# (scalars or arrays) of the input and output
+def _np_ntt(vals, modulus, root_of_unity, pre=None, post=None):
+    rev, powers = _get_np_fft_tables(modulus, root_of_unity)
+    n = len(rev)
+    a = _np_array(vals, modulus, n)
+    if pre is not None:
+        a = _np_mul(a, pre, modulus)
+    a = a[rev]
+    half = 1
+    while half < n:
+        v = a.reshape(-1, 2 * half)
+        x = v[:, :half]
+        y = _np_mul(v[:, half:], powers[::n // (2 * half)], modulus)
+        v[:, half:] = _np_sub(x, y, modulus)
+        v[:, :half] = _np_add(x, y, modulus)
+        half *= 2
+    if post is not None:
+        a = _np_mul(a, np.uint64(post) if isinstance(post, int) else post, modulus)
+    return a
+
+# Pointwise arithmetic over lists of field elements, on the NumPy kernels
+# when the modulus allows it
+def vec_add(a, b, modulus):
+    if _use_numpy(modulus, len(a)):
+        return _np_add(_np_array(a, modulus), _np_array(b, modulus), modulus).tolist()
+    return [(x + y) % modulus for x, y in zip(a, b)]
+
+def vec_sub(a, b, modulus):
+    if _use_numpy(modulus, len(a)):
+        return _np_sub(_np_array(a, modulus), _np_array(b, modulus), modulus).tolist()
+    return [(x - y) % modulus for x, y in zip(a, b)]
+
+def vec_mul(a, b, modulus):
+    if _use_numpy(modulus, len(a)):
+        return _np_mul(_np_array(a, modulus), _np_array(b, modulus), modulus).tolist()
+    return [x * y % modulus for x, y in zip(a, b)]
+
+# Residue number system (RNS) polynomial multiplication for moduli too wide
+# for the uint64 kernels: coefficients are reduced modulo several ~31-bit
+# NTT-friendly primes, multiplied with NumPy NTTs per prime and recombined
+# with Garner's CRT, which is exact as long as the primes' product exceeds
+# the largest integer coefficient of the product.
+# Primes c * 2^22 + 1 below 2^31, so transforms of up to 2^22 points
+RNS_PRIMES = [
+    2130706433, 2113929217, 2088763393, 2025848833, 2013265921, 1866465281,
+    1811939329, 1790967809, 1711276033, 1572864001, 1484783617, 1438646273,
+    1321205761, 1300234241, 1224736769, 1212153857, 1161822209, 1107296257,
+    998244353, 985661441, 943718401, 935329793, 918552577, 897581057,
+    880803841, 754974721, 683671553, 666894337, 645922817, 595591169,
+    469762049, 415236097,
+]
+RNS_MAX_LOG_SIZE = 22
+RNS_AVAILABLE = np is not None
+# mul_polys switches to RNS for transforms of at least this many points,
+# below it the Python-int NTT is as fast
+RNS_THRESHOLD = 4096
+
+def _use_rns(modulus, n):
+    return np is not None and modulus >= 2**32 and modulus != GOLDILOCKS and n >= RNS_THRESHOLD
+
+# Root of unity of order n modulo the RNS prime q
+def _rns_root(q, n):
+    x = 2
+    while pow(x, (q - 1) // 2, q) == 1:
+        x += 1
+    return pow(x, (q - 1) // n, q)
+
+# Coefficients as an (len(vals), limbs) uint64 array of 16-bit limbs
+def _np_limbs(vals, modulus, limbs):
+    data = b"".join((x % modulus).to_bytes(limbs * 2, "little") for x in vals)
+    return np.frombuffer(data, dtype="<u2").reshape(len(vals), limbs).astype(np.uint64)
+
+# Cached per (modulus, number of primes): 2^(16j) mod q for every limb j and
+# prime q, the Garner constants and the limbs of (q_0 ... q_(i-1)) mod modulus
+_rns_tables = {}
+
+def _get_rns_tables(modulus, k):
+    key = (modulus, k)
+    tables = _rns_tables.get(key)
+    if tables is None:
+        qs = RNS_PRIMES[:k]
+        limbs = (modulus.bit_length() + 15) // 16
+        weights = np.array([[pow(2, 16 * j, q) for q in qs] for j in range(limbs)], dtype=np.uint64)
+        # prefix[i] = q_0 * ... * q_(i-1)
+        prefix = [1]
+        for q in qs[:-1]:
+            prefix.append(prefix[-1] * q)
+        garner = [([P % q for P in prefix[:i]], pow(prefix[i] % q, q - 2, q))
+                  for i, q in enumerate(qs)]
+        out_limbs = limbs + 3
+        prefix_limbs = _np_limbs([P % modulus for P in prefix], modulus, out_limbs)
+        tables = (qs, limbs, weights, garner, prefix_limbs, out_limbs)
+        _rns_tables[key] = tables
+    return tables
+
+# Linear product of polynomials a and b with coefficients mod modulus
+def rns_mul_polys(a, b, modulus):
+    if not a or not b:
+        return []
+    out_len = len(a) + len(b) - 1
+    n = 1
+    while n < out_len:
+        n *= 2
+    assert n <= 2**RNS_MAX_LOG_SIZE
+    # pick enough primes to hold min(len) * (p - 1)^2 exactly
+    bound = min(len(a), len(b)) * (modulus - 1) ** 2
+    k, prod = 0, 1
+    while prod <= bound:
+        prod *= RNS_PRIMES[k]
+        k += 1
+    qs, limbs, weights, garner, prefix_limbs, out_limbs = _get_rns_tables(modulus, k)
+    qarr = np.array(qs, dtype=np.uint64)
+    # residues of every coefficient modulo every prime, limbs * 2^(16j) < 2^51
+    ra = (_np_limbs(a, modulus, limbs) @ weights) % qarr
+    rb = ra if a is b else (_np_limbs(b, modulus, limbs) @ weights) % qarr
+
+    residues = []
+    for i, q in enumerate(qs):
+        root = _rns_root(q, n)
+        x1 = _np_ntt(ra[:, i], q, root)
+        x2 = x1 if a is b else _np_ntt(rb[:, i], q, root)
+        residues.append(_np_ntt(_np_mul(x1, x2, q), q, pow(root, n - 1, q),
+                                post=pow(n, q - 2, q))[:out_len])
+
+    # Garner: mixed-radix digits v_i with value = sum v_i * q_0 * ... * q_(i-1)
+    digits = []
+    for i, q in enumerate(qs):
+        qi = np.uint64(q)
+        consts, inv_prefix = garner[i]
+        acc = np.zeros(out_len, dtype=np.uint64)
+        for v, c in zip(digits, consts):
+            acc = (acc + v * np.uint64(c)) % qi
+        digits.append((residues[i] + qi - acc) % qi * np.uint64(inv_prefix) % qi)
+
+    # sum v_i * (prefix_i mod p) in 16-bit limbs, each column sum below 2^52
+    sums = np.stack(digits, axis=1) @ prefix_limbs
+    for j in range(out_limbs - 1):
+        sums[:, j + 1] += sums[:, j] >> np.uint64(16)
+        sums[:, j] &= np.uint64(0xffff)
+    data = sums.astype("<u2").tobytes()
+    width = out_limbs * 2
+    return [int.from_bytes(data[i * width:(i + 1) * width], "little") % modulus
+            for i in range(out_len)]
+
+# Four-step (Bailey) FFT: transforms of at least FOUR_STEP_THRESHOLD points
+# can be split over FOUR_STEP_WORKERS processes.  The pool is opt-in, either
+# with the FOUR_STEP_WORKERS environment variable or by setting the module
+# variable (or passing workers=) to more than 1; by default everything stays
+# in-process.
+FOUR_STEP_THRESHOLD = 2**16
+FOUR_STEP_WORKERS = int(os.environ.get("FOUR_STEP_WORKERS", "1"))
+
+def _use_four_step(n):
+    return (n >= FOUR_STEP_THRESHOLD and FOUR_STEP_WORKERS > 1
+            and "fork" in get_all_start_methods())
+
+_four_step_pool = None
+_four_step_pool_workers = 0
+
+def _get_four_step_pool(workers):
+    global _four_step_pool, _four_step_pool_workers
+    if _four_step_pool is None or _four_step_pool_workers != workers:
+        if _four_step_pool is not None:
+            _four_step_pool.shutdown()
+        # fork so that scripts doing their work at import time are not re-run
+        _four_step_pool = ProcessPoolExecutor(workers, mp_context=get_context("fork"))
+        _four_step_pool_workers = workers
+    return _four_step_pool
+
+# Step 1 and 2 of the four-step FFT for the columns i2 = c0, c0 + 1, ...:
+# an R-point FFT down each column with root w^C, then scaling of entry k1
+# of column i2 by the twiddle w^(i2 * k1)
+def _four_step_columns(modulus, root_of_unity, cols, c0, columns):
+    _, rev, fwd_tw, _ = _get_fft_tables(modulus, pow(root_of_unity, cols, modulus))
+    out = []
+    for i2, col in enumerate(columns, c0):
+        col = _ntt(col, modulus, rev, fwd_tw)
+        w = pow(root_of_unity, i2, modulus)
+        t = 1
+        for k1 in range(len(col)):
+            col[k1] = col[k1] * t % modulus
+            t = t * w % modulus
+        out.append(col)
+    return out
+
+# FFT of each of the rows, multiplied by scale (1/n for inverse transforms).
+# This is step 3 of the four-step FFT and the worker of fft_many.
+def _row_ffts(modulus, root_of_unity, rows, scale=1):
+    _, rev, fwd_tw, _ = _get_fft_tables(modulus, root_of_unity)
+    out = []
+    for row in rows:
+        row = _ntt(row, modulus, rev, fwd_tw)
+        out.append(row if scale == 1 else [v * scale % modulus for v in row])
+    return out
+
+def _split_range(n, parts):
+    step = (n + parts - 1) // parts
+    return [(i, min(i + step, n)) for i in range(0, n, step)]
+
+# Views the n = R * C input as an R x C matrix with x[C * i1 + i2] at (i1, i2),
+# runs the column FFTs (fused with the twiddle multiply) and then the row FFTs
+# on a process pool.  The vectors are sent to the workers as lists of ints,
+# the strided gathers and transposes are list slicing and zip.  Output
+# X[k1 + R * k2] ends up at (k1, k2), so it is read back transposed.
+def four_step_fft(vals, modulus, root_of_unity, inv=False, workers=None):
+    workers = workers or FOUR_STEP_WORKERS
+    rootz = _get_fft_tables(modulus, root_of_unity)[0]
+    n = len(rootz) - 1
+    assert n & (n - 1) == 0
+    if len(vals) < n:
+        vals = vals + [0] * (n - len(vals))
+    if inv:
+        root_of_unity = rootz[-2]
+    rows = 1 << ((n.bit_length() - 1) // 2)
+    cols = n // rows
+    vals = [v % modulus for v in vals]
+
+    pool = _get_four_step_pool(workers)
+    columns = []
+    for f in [pool.submit(_four_step_columns, modulus, root_of_unity, cols, c0,
+                          [vals[i2::cols] for i2 in range(c0, c1)])
+              for c0, c1 in _split_range(cols, workers)]:
+        columns += f.result()
+    matrix = [list(row) for row in zip(*columns)]
+    row_root = pow(root_of_unity, rows, modulus)
+    matrix_rows = []
+    for f in [pool.submit(_row_ffts, modulus, row_root, matrix[r0:r1])
+              for r0, r1 in _split_range(rows, workers)]:
+        matrix_rows += f.result()
+    o = [x for col in zip(*matrix_rows) for x in col]
+    if inv:
+        invlen = pow(n, modulus-2, modulus)
+        return [(x*invlen) % modulus for x in o]
+    return o
+
+# Transforms every row (axis=1) or every column (axis=0) of a 2D list of
+# values in one call. All vectors share one set of cached twiddles, and once
+# the matrix holds at least FOUR_STEP_THRESHOLD values the vectors can be
+# spread over FOUR_STEP_WORKERS processes (opt-in, see above).
+# Returns the transformed matrix in the same layout as the input.
+def fft_many(matrix, modulus, root_of_unity, inv=False, axis=1, workers=None):
+    assert axis in (0, 1)
+    workers = workers or FOUR_STEP_WORKERS
+    rootz, rev, fwd_tw, inv_tw = _get_fft_tables(modulus, root_of_unity)
+    n = len(rootz) - 1
+    if axis == 0:
+        vecs = [list(col) for col in zip(*matrix)]
+    else:
+        vecs = [list(row) for row in matrix]
+    vecs = [v + [0] * (n - len(v)) if len(v) < n else v for v in vecs]
+
+    if rev is None or len(vecs) * n < FOUR_STEP_THRESHOLD or workers <= 1 \
+            or "fork" not in get_all_start_methods():
+        out = [fft(v, modulus, root_of_unity, inv) for v in vecs]
+    else:
+        pool = _get_four_step_pool(workers)
+        if inv:
+            root, scale = rootz[-2], pow(n, modulus-2, modulus)
+        else:
+            root, scale = root_of_unity, 1
+        out = []
+        for f in [pool.submit(_row_ffts, modulus, root,
+                              [[x % modulus for x in v] for v in vecs[r0:r1]], scale)
+                  for r0, r1 in _split_range(len(vecs), workers)]:
+            out += f.result()
+
+    if axis == 0:
+        return [list(row) for row in zip(*out)]
+    return out
 
 # Evaluates f(x) for f in evaluation form
 def inv_fft_at_point(vals, modulus, root_of_unity, x):
@@ -72,14 +620,10 @@ def shift_domain(vals, modulus, root_of_unity, factor):
     f_of_minus_x_vals = vals[half_length:] + vals[:half_length]
     # e(x) = (f(x) + f(-x)) / 2 in evaluation form
     evens = [(f+g) * half % modulus for f,g in zip(vals, f_of_minus_x_vals)]
-    print('e', evens)
     # o(x) = (f(x) - f(-x)) / 2 in evaluation form
     odds = [(f-g) * half % modulus for f,g in zip(vals, f_of_minus_x_vals)]
-    print('o', odds)
     shifted_evens = shift_domain(evens[:half_length], modulus, root_of_unity ** 2 % modulus, factor ** 2 % modulus)
-    print('se', shifted_evens)
     shifted_odds = shift_domain(odds[:half_length], modulus, root_of_unity ** 2 % modulus, factor ** 2 % modulus)
-    print('so', shifted_odds)
     return (
         [(e + inv_factor * o) % modulus for e, o in zip(shifted_evens, shifted_odds)] + 
         [(e - inv_factor * o) % modulus for e, o in zip(shifted_evens, shifted_odds)]
@@ -95,14 +639,112 @@ def shift_poly(poly, modulus, factor):
     return o
 
 def mul_polys(a, b, modulus, root_of_unity):
-    rootz = [1, root_of_unity]
-    while rootz[-1] != 1:
-        rootz.append((rootz[-1] * root_of_unity) % modulus)
+    n = _np_order(modulus, root_of_unity)
+    if n:
+        x1 = _np_ntt(a, modulus, root_of_unity)
+        x2 = _np_ntt(b, modulus, root_of_unity)
+        return _np_ntt(_np_mul(x1, x2, modulus), modulus,
+                       pow(root_of_unity, n-1, modulus)).tolist()
+    n = _pow2_order(modulus, root_of_unity)
+    if n and _use_rns(modulus, n) and n <= 2**RNS_MAX_LOG_SIZE:
+        # same result as the transforms below: the product wrapped around
+        # x^n - 1 and scaled by n, as the inverse transform is not normalised
+        o = [0] * n
+        for i, c in enumerate(rns_mul_polys(a, b, modulus)):
+            o[i % n] += c
+        return [x * n % modulus for x in o]
+    rootz, rev, fwd_tw, inv_tw = _get_fft_tables(modulus, root_of_unity)
     if len(rootz) > len(a) + 1:
         a = a + [0] * (len(rootz) - len(a) - 1)
     if len(rootz) > len(b) + 1:
         b = b + [0] * (len(rootz) - len(b) - 1)
-    x1 = _fft(a, modulus, rootz[:-1])
-    x2 = _fft(b, modulus, rootz[:-1])
-    return _fft([(v1*v2)%modulus for v1,v2 in zip(x1,x2)],
-               modulus, rootz[:0:-1])
+    if rev is None:
+        x1 = _fft(a, modulus, rootz[:-1])
+        x2 = _fft(b, modulus, rootz[:-1])
+        return _fft([(v1*v2)%modulus for v1,v2 in zip(x1,x2)],
+                   modulus, rootz[:0:-1])
+    x1 = _ntt(a, modulus, rev, fwd_tw)
+    x2 = _ntt(b, modulus, rev, fwd_tw)
+    return _ntt([(v1*v2)%modulus for v1,v2 in zip(x1,x2)],
+                modulus, rev, inv_tw)
+
+def test_numpy_kernels():
+    import random
+    # Goldilocks and the 31-bit 15 * 2^27 + 1, with generators 7 and 31
+    for modulus, g in [(GOLDILOCKS, 7), (15 * 2**27 + 1, 31)]:
+        edge = [0, 1, 2, modulus - 1, modulus - 2, (modulus - 1) // 2,
+                2**32 - 1 if modulus > 2**32 else 2**16 - 1, 2**32 % modulus]
+        for n in [NUMPY_THRESHOLD - 1, NUMPY_THRESHOLD, NUMPY_THRESHOLD + 1, 4 * NUMPY_THRESHOLD]:
+            for a in [[random.randrange(modulus) for i in range(n)],
+                      [modulus - 1] * n,
+                      [random.choice(edge) for i in range(n)]]:
+                b = [random.choice(edge) if i % 2 else random.randrange(modulus) for i in range(n)]
+                assert vec_mul(a, b, modulus) == [x * y % modulus for x, y in zip(a, b)]
+                assert vec_mul(a, a, modulus) == [x * x % modulus for x in a]
+                assert vec_add(a, b, modulus) == [(x + y) % modulus for x, y in zip(a, b)]
+                assert vec_sub(a, b, modulus) == [(x - y) % modulus for x, y in zip(a, b)]
+        for n in [NUMPY_THRESHOLD // 2, NUMPY_THRESHOLD, 4 * NUMPY_THRESHOLD]:
+            root = pow(g, (modulus - 1) // n, modulus)
+            rootz = expand_root_of_unity(root, modulus)[:-1]
+            for vals in [[random.randrange(modulus) for i in range(n)], [modulus - 1] * n]:
+                o = fft(vals, modulus, root)
+                assert o == _simple_ft(vals, modulus, rootz)
+                assert fft(o, modulus, root, inv=True) == vals
+            # products of degree < n / 2 do not wrap around
+            a = [random.randrange(modulus) for i in range(n // 2)]
+            b = [modulus - 1] * (n // 2)
+            expected = [0] * n
+            for i, x in enumerate(a):
+                for j, y in enumerate(b):
+                    expected[i + j] = (expected[i + j] + x * y * n) % modulus
+            assert mul_polys(a, b, modulus, root) == expected
+    print("test_numpy_kernels passed")
+
+def test_rns_mul_polys():
+    import random
+    from math import isqrt
+    def schoolbook(a, b, modulus):
+        o = [0] * (len(a) + len(b) - 1)
+        for i, x in enumerate(a):
+            for j, y in enumerate(b):
+                o[i + j] += x * y
+        return [x % modulus for x in o]
+    # 256-bit prime, 2^32 divides p - 1 and 7 is a non-residue
+    modulus = 2**256 - 2**32 * 351 + 1
+    for la, lb in [(1, 1), (33, 31), (300, 300), (RNS_THRESHOLD // 2, 5),
+                   (RNS_THRESHOLD - 40, 41), (RNS_THRESHOLD, 3)]:
+        a = [random.randrange(modulus) for i in range(la)]
+        b = [random.randrange(modulus) for i in range(lb)]
+        assert rns_mul_polys(a, b, modulus) == schoolbook(a, b, modulus)
+        assert rns_mul_polys(b, b, modulus) == schoolbook(b, b, modulus)
+    # mul_polys on either side of RNS_THRESHOLD: the product wrapped around
+    # x^n - 1 and scaled by n
+    for n in [RNS_THRESHOLD // 2, RNS_THRESHOLD]:
+        root = pow(7, (modulus - 1) // n, modulus)
+        a = [random.randrange(modulus) for i in range(n - 3)]
+        b = [random.randrange(modulus) for i in range(8)]
+        expected = [0] * n
+        for i, c in enumerate(schoolbook(a, b, modulus)):
+            expected[i % n] = (expected[i % n] + c * n) % modulus
+        assert mul_polys(a, b, modulus, root) == expected
+    # all p - 1 inputs reach the CRT bound min(len) * (p - 1)^2, coefficient
+    # k of the product is then (p - 1)^2 times the number of pairs i + j = k
+    def check_max(length, modulus):
+        a = [modulus - 1] * length
+        o = rns_mul_polys(a, list(a), modulus)
+        assert o == [min(k + 1, 2 * length - 1 - k) % modulus for k in range(2 * length - 1)]
+    check_max(RNS_THRESHOLD // 2, modulus)
+    check_max(2**(RNS_MAX_LOG_SIZE - 4), modulus)
+    # moduli (not prime, rns_mul_polys does not need it) that put the bound
+    # just below and just above a product of the primes
+    for length, k in [(64, 17), (RNS_THRESHOLD, 18)]:
+        prod = 1
+        for q in RNS_PRIMES[:k]:
+            prod *= q
+        check_max(length, isqrt((prod - 1) // length) + 1)
+        check_max(length, isqrt(prod // length) + 2)
+    print("test_rns_mul_polys passed")
+
+if __name__ == "__main__":
+    test_numpy_kernels()
+    test_rns_mul_polys()
@@ -4,9 +4,10 @@ import random
 import hashlib
 
 from fft import fft
-from ec import (G1Generator, G2Generator, default_ec)
+from ec import (G1Generator, G2Generator, default_ec,
+                fixed_base_mul, fixed_base_mul_many, multi_scalar_mult)
 from poly_utils import PrimeField
-from pairing import ate_pairing
+from pairing import G2Prepared, pairing_product_is_one
 
 class PolyCommitment:
     def __init__(self, setup=None):
@@ -19,26 +20,39 @@ class PolyCommitment:
             self.G2 = G2Generator()
             self.setup_vec1 = []
             self.setup_vec2 = []
+            self.prepared_g2 = None
         else:
             assert False
 
+    # s^i for i in [start, end)
+    def secretPowers(self, start, end):
+        return [pow(self.secret, i, self.modulus) for i in range(start, end)]
+
     def getSetupVector1(self, length):
-        for i in range(len(self.setup_vec1), length):
-            self.setup_vec1.append(self.G1 * (self.secret ** i))
+        # G1, G2 are the generators, so the fixed-base tables apply
+        if length > len(self.setup_vec1):
+            self.setup_vec1 += fixed_base_mul_many(self.secretPowers(len(self.setup_vec1), length))
         return self.setup_vec1[0:length]
 
     def getSetupVector2(self, length):
-        for i in range(len(self.setup_vec2), length):
-            self.setup_vec2.append(self.G2 * (self.secret ** i))
+        if length > len(self.setup_vec2):
+            self.setup_vec2 += fixed_base_mul_many(self.secretPowers(len(self.setup_vec2), length), g2=True)
         return self.setup_vec2[0:length]
 
+    # Miller loop line coefficients of [1] and [s] in G2, computed once
+    # and shared by all the verifier pairings
+    def getPreparedG2(self):
+        if self.prepared_g2 is None:
+            self.prepared_g2 = (G2Prepared(self.G2), G2Prepared(self.G2 * self.secret))
+        return self.prepared_g2
+
     # get the commitment of a polynomial in evaluation form
     # return a curve point
     def getCommitment(self, evals, g):
         # g - roots of unity
         coeffs = fft(evals, self.pf.modulus, g, inv=True)
         sv = self.getSetupVector1(len(coeffs))
-        return sum(s * c for s, c in zip(sv, coeffs))
+        return multi_scalar_mult(sv, coeffs)
 
     def getSingleProofByEvalIdx(self, evals, g, idx):
         # g - primitive root of unity
@@ -57,17 +71,17 @@ class PolyCommitment:
         # qx = (x^n - 1) / (x-x0)
         coeffs = coeffs[:]
         coeffs[0] = coeffs[0] - y0
-        qx = self.pf.div_polys(coeffs, [self.modulus-x0, 1])
+        qx = self.pf.div_by_linear(coeffs, x0)
         sv = self.getSetupVector1(len(qx))
-        return sum(s * c for s, c in zip(sv, qx))
+        return multi_scalar_mult(sv, qx)
 
     def verifySingleProof(self, commit, proof, x0, y0):
-        sz2 = self.G2 * self.secret + (self.G2 * x0).negate()
-        pair0 = ate_pairing(proof, sz2)
-
-        cy = commit + (self.G1 * y0).negate()
-        pair1 = ate_pairing(cy, self.G2)
-        return pair0 == pair1
+        # e(c - [y0], [1]) = e(proof, [s - x0]) with x0 moved to G1,
+        # e(c - [y0] + proof * x0, [1]) = e(proof, [s]), so that both G2
+        # points are fixed and prepared
+        g2, sg2 = self.getPreparedG2()
+        cy = commit + fixed_base_mul(y0).negate() + proof * x0
+        return pairing_product_is_one([(proof, sg2), (cy.negate(), g2)])
 
 
 def test_poly_commitment():
@@ -1,14 +1,17 @@
 # A simple STARK code to demonstrate Fibonacci sequence check
 from poly_utils import PrimeField
 import random
-from fft import fft
+from fft import fft, lde, GOLDILOCKS
 from merkle_tree import merkelize, mk_branch, verify_branch, mk_multi_branch, verify_multi_branch
 
 # Number of P(x) values, i.e., length of computation (G1)
 n = 128
 extension_factor = 32
 
-modulus = 2**256 - 2**32 * 351 + 1
+# Use the 64-bit Goldilocks field, whose NTTs run on NumPy uint64 kernels
+small_field = False
+
+modulus = GOLDILOCKS if small_field else 2**256 - 2**32 * 351 + 1
 f = PrimeField(modulus)
 
 # Size of the larger group for sampling (G2)
@@ -24,9 +27,8 @@ v[1] = 1
 for i in range(2, n):
     v[i] = v[i-1] + v[i-2]
 
-p_poly = fft(v, modulus, G1, inv=True)
 # Evaluations of P(x) over G2
-p_evals = fft(p_poly, modulus, G2)
+p_evals = lde(v, modulus, G2, extension_factor)
 
 # Evaluations of C(P(x), P(x*g1), P(x*g1*g1), K(x)) = P(x *g1 *g1) - P(x*g1) - P(x)= 0
 cp_evals = [(p_evals[(i+2*extension_factor) % precision] - p_evals[(i+extension_factor) % precision] - p_evals[i]) % modulus for i in range(precision)]
@@ -44,7 +46,7 @@ z_poly_evals = [xs[(i * n) % precision] - 1 for i in range(precision)]
 inv_z_poly_evals = f.multi_inv(z_poly_evals)
 z_den_evaluations = [(xs[i] - (-G1)) * (xs[i] - (- 2 * G1)) % modulus for i in range(precision)]
 
-d_evals = [cp * iz * zd % modulus for cp, iz, zd in zip(cp_evals, inv_z_poly_evals, z_den_evaluations)]
+d_evals = f.mul_vec(f.mul_vec(cp_evals, inv_z_poly_evals), z_den_evaluations)
 print("D(x) generated")
 
 # Find B(x) such that
@@ -58,7 +60,7 @@ iz2_evals = f.multi_inv(z2_evals)
 i_poly = f.lagrange_interp([G1, 2*G1, -G1], [v[0], v[1], v[-1]])
 i_evals = fft(i_poly, modulus, G2)
 
-b_evals = [((p - i) * iz2) % modulus for p, i, iz2 in zip(p_evals, i_evals, iz2_evals)]
+b_evals = f.mul_vec(f.sub_vec(p_evals, i_evals), iz2_evals)
 print("B(x) generated")
 
 # Commit the Merkle tree of D(x) and P(x).
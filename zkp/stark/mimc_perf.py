@@ -1,6 +1,12 @@
 import random
 import time
 
+from field_backend import backend_name, get_backend
+
+# FIELD_BACKEND=python|gmpy2 selects the modular exponentiation
+powmod, _ = get_backend()
+print("Field backend:", backend_name())
+
 print("Use max 256 bit modulus")
 modulus = 2**256 - 2**32 * 351 + 1
 power = 3
@@ -16,12 +22,12 @@ MIMC_constants = [(i**7) ^ 42 for i in range(64)] # MiMC round constants
 
 def mimc_encode(inp, steps, round_constants):
     for i in reversed(range(steps-1)):
-        inp = (pow((inp - round_constants[i % len(round_constants)]) % modulus, encode_power, modulus)) % modulus
+        inp = (powmod((inp - round_constants[i % len(round_constants)]) % modulus, encode_power, modulus)) % modulus
     return inp
 
 def mimc_decode(inp, steps, round_constants):
     for i in range(steps-1):
-        inp = (pow(inp, power, modulus) + round_constants[i % len(round_constants)]) % modulus
+        inp = (powmod(inp, power, modulus) + round_constants[i % len(round_constants)]) % modulus
     return inp
 
 n = 20000
@@ -1,6 +1,12 @@
 import random
 import time
 
+from field_backend import backend_name, get_backend
+
+# FIELD_BACKEND=python|gmpy2 selects the modular exponentiation
+powmod, _ = get_backend()
+print("Field backend:", backend_name())
+
 print("Use max 256 bit modulus")
 modulus = 2**256 - 2**32 * 351 + 1
 power = 3
@@ -18,7 +24,7 @@ encode_power = ((power - 1) * modulus - (power - 2)) // power
 def minroot_encode(inp, steps):
     inp = inp[:]
     for i in reversed(range(steps-1)):
-        t = pow((inp[0] + inp[1]) % modulus, encode_power, modulus)
+        t = powmod((inp[0] + inp[1]) % modulus, encode_power, modulus)
         inp[1:len(inp)-1] = inp[2:len(inp)]
         inp[-1] = inp[0]
         inp[1] = (inp[1] + i) % modulus
@@ -29,7 +35,7 @@ def minroot_encode(inp, steps):
 def minroot_decode(inp, steps):
     inp = inp[:]
     for i in range(steps-1):
-        t = pow(inp[0], power, modulus)
+        t = powmod(inp[0], power, modulus)
         inp[1] = (inp[1] - i) % modulus
         inp[0] = inp[-1]
         inp[2:len(inp)] = inp[1:len(inp) - 1]
@@ -43,7 +49,7 @@ def minroot_decode_opt(inp, steps):
         j = -i % m 
         jn1 = (j - 1) % m
         jp1 = (j + 1) % m
-        t = pow(inp[j], power, modulus)
+        t = powmod(inp[j], power, modulus)
         inp[jp1] = (inp[jp1] - i) % modulus
         inp[j] = (t - inp[jn1]) % modulus
     
@@ -57,7 +63,7 @@ def minroot_decode_opt(inp, steps):
 def minroot2_encode(inp, steps):
     inp = inp[:]
     for i in reversed(range(steps-1)):
-        t = pow((inp[0] + inp[1]) % modulus, encode_power, modulus)
+        t = powmod((inp[0] + inp[1]) % modulus, encode_power, modulus)
         inp[1] = (inp[0] + i) % modulus
         inp[0] = t
     return inp
@@ -65,7 +71,7 @@ def minroot2_encode(inp, steps):
 def minroot3_encode(inp, steps):
     a, b, c = inp
     for i in reversed(range(steps-1)):
-        t = pow((a + b) % modulus, encode_power, modulus)
+        t = powmod((a + b) % modulus, encode_power, modulus)
         b = (c + i) % modulus
         c = a
         a = t
@@ -74,7 +80,7 @@ def minroot3_encode(inp, steps):
 def minroot2_decode(inp, steps):
     inp = inp[:]
     for i in range(steps-1):
-        t = pow(inp[0], power, modulus)
+        t = powmod(inp[0], power, modulus)
         inp[0] = (inp[1] - i) % modulus
         inp[1] = (t - inp[0]) % modulus
     return inp
@@ -82,7 +88,7 @@ def minroot2_decode(inp, steps):
 def minroot3_decode(inp, steps):
     a, b, c = inp
     for i in range(steps-1):
-        t = pow(a, power, modulus)
+        t = powmod(a, power, modulus)
         a = c
         c = (b - i) % modulus
         b = (t - a) % modulus
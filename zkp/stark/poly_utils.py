@@ -1,9 +1,25 @@
+from fft import vec_add, vec_sub, vec_mul, RNS_AVAILABLE, rns_mul_polys, mul_polys as fft_mul_polys
+from field_backend import backend_name, get_backend
+
+# (order, generator) of the 2-adic subgroup per modulus
+_two_adic_roots = {}
+
 # Creates an object that includes convenience operations for numbers
 # and polynomials in some prime field
 class PrimeField():
-    def __init__(self, modulus):
+    # mul_polys thresholds on the length of the shorter polynomial
+    KARATSUBA_THRESHOLD = 32
+    NTT_THRESHOLD = 192
+    # div_polys switches from long division to Newton inversion once the
+    # divisor is at least this long
+    NEWTON_THRESHOLD = 256
+
+    # backend - "gmpy2" or "python" for exp / inv, see field_backend
+    def __init__(self, modulus, backend=None):
         assert pow(2, modulus, modulus) == 2
         self.modulus = modulus
+        self.backend = backend_name(backend)
+        self._powmod, self._invert = get_backend(self.backend)
 
     def add(self, x, y):
         return (x+y) % self.modulus
@@ -15,19 +31,11 @@ class PrimeField():
         return (x*y) % self.modulus
 
     def exp(self, x, p):
-        return pow(x, p, self.modulus)
+        return self._powmod(x, p, self.modulus)
 
-    # Modular inverse using the extended Euclidean algorithm
+    # Modular inverse, 0 for 0
     def inv(self, a):
-        if a == 0:
-            return 0
-        lm, hm = 1, 0
-        low, high = a % self.modulus, self.modulus
-        while low > 1:
-            r = high//low
-            nm, new = hm-lm*r, high-low*r
-            lm, low, hm, high = nm, new, lm, low
-        return lm % self.modulus
+        return self._invert(a, self.modulus)
 
     def multi_inv(self, values):
         partials = [1]
@@ -43,6 +51,17 @@ class PrimeField():
     def div(self, x, y):
         return self.mul(x, self.inv(y))
 
+    # Pointwise arithmetic over lists, vectorised with NumPy for the
+    # small fields supported by fft (primes below 2^32 and Goldilocks)
+    def add_vec(self, a, b):
+        return vec_add(a, b, self.modulus)
+
+    def sub_vec(self, a, b):
+        return vec_sub(a, b, self.modulus)
+
+    def mul_vec(self, a, b):
+        return vec_mul(a, b, self.modulus)
+
     # Evaluate a polynomial at a point
     def eval_poly_at(self, p, x):
         y = 0
@@ -64,47 +83,151 @@ class PrimeField():
     def mul_by_const(self, a, c):
         return [(x*c) % self.modulus for x in a]
     
+    # Root of unity of order n (a power of 2), or None if the 2-adic
+    # subgroup of the field is too small
+    def root_of_unity(self, n):
+        m = self.modulus
+        if m not in _two_adic_roots:
+            s = 0
+            while ((m - 1) >> s) % 2 == 0:
+                s += 1
+            x = 2
+            while pow(x, (m - 1) // 2, m) == 1:
+                x += 1
+            _two_adic_roots[m] = (2**s, pow(x, (m - 1) >> s, m))
+        order, root = _two_adic_roots[m]
+        if order % n:
+            return None
+        return pow(root, order // n, m)
+
+    # Schoolbook below KARATSUBA_THRESHOLD coefficients, Karatsuba up to
+    # NTT_THRESHOLD and an NTT over an automatically picked root of unity
+    # above it (multi-prime RNS NTTs if the field has no large enough one)
     def mul_polys(self, a, b):
+        if min(len(a), len(b)) >= self.NTT_THRESHOLD:
+            out_len = len(a) + len(b) - 1
+            n = 1
+            while n < out_len:
+                n *= 2
+            root = self.root_of_unity(n)
+            if root is not None:
+                # fft.mul_polys does not normalise the inverse transform
+                invn = self.inv(n)
+                return [x * invn % self.modulus for x in
+                        fft_mul_polys(a, b, self.modulus, root)[:out_len]]
+            if RNS_AVAILABLE:
+                return rns_mul_polys(a, b, self.modulus)
+        return [x % self.modulus for x in self._karatsuba(a, b)]
+
+    # Unreduced product of a and b
+    def _karatsuba(self, a, b):
+        if len(a) < len(b):
+            a, b = b, a
         o = [0] * (len(a) + len(b) - 1)
-        for i, aval in enumerate(a):
-            for j, bval in enumerate(b):
-                o[i+j] += a[i] * b[j]
-        return [x % self.modulus for x in o]
+        if len(b) < self.KARATSUBA_THRESHOLD:
+            for i, aval in enumerate(a):
+                for j, bval in enumerate(b):
+                    o[i+j] += aval * bval
+            return o
+        h = len(a) // 2
+        if len(b) <= h:
+            # b only needs to be multiplied by each half of a
+            for i, x in enumerate(self._karatsuba(a[:h], b)):
+                o[i] += x
+            for i, x in enumerate(self._karatsuba(a[h:], b)):
+                o[i+h] += x
+            return o
+        a0, a1, b0, b1 = a[:h], a[h:], b[:h], b[h:]
+        # (a0 + a1) * (b0 + b1) - a0 * b0 - a1 * b1 is the middle term
+        asum = [x + y for x, y in zip(a0, a1)] + a1[len(a0):]
+        bsum = [x + y for x, y in zip(b0, b1)] + b0[len(b1):] + b1[len(b0):]
+        for i, x in enumerate(self._karatsuba(asum, bsum)):
+            o[i+h] += x
+        for i, x in enumerate(self._karatsuba(a0, b0)):
+            o[i] += x
+            o[i+h] -= x
+        for i, x in enumerate(self._karatsuba(a1, b1)):
+            o[i+2*h] += x
+            o[i+h] -= x
+        return o
     
-    def div_polys(self, a, b):
-        assert len(a) >= len(b)
+    # Quotient of a by (x - x0) with synthetic division, O(n)
+    def div_by_linear(self, a, x0):
+        return self._div_by_linear(a, x0)[0]
+
+    # Returns the quotient and a(x0)
+    def _div_by_linear(self, a, x0):
+        m = self.modulus
+        o = [0] * (len(a) - 1)
+        carry = 0
+        for i in range(len(a) - 1, 0, -1):
+            carry = (a[i] + carry * x0) % m
+            o[i-1] = carry
+        return o, (a[0] + carry * x0) % m
+
+    # Power series reciprocal 1/a mod x^n via Newton iteration.  Every round
+    # doubles the precision with g' = g + g * (1 - a * g); since a * g = 1
+    # mod x^k only the upper half of a * g is needed.
+    def inv_series(self, a, n):
+        m = self.modulus
+        g = [self.inv(a[0])]
+        k = 1
+        while k < n:
+            k2 = min(2 * k, n)
+            e = self.mul_polys(a[:k2], g)[k:k2]
+            ge = self.mul_polys(g[:k2-k], e)
+            g = g + [-x % m for x in ge[:k2-k]]
+            g += [0] * (k2 - len(g))
+            k = k2
+        return g
+
+    # Quotient from the reversed polynomials:
+    # rev(q) = rev(a) / rev(b) mod x^(len(a)-len(b)+1)
+    def _div_newton(self, a, b):
+        k = len(a) - len(b) + 1
+        rq = self.mul_polys(a[::-1][:k], self.inv_series(b[::-1][:k], k))[:k]
+        rq += [0] * (k - len(rq))
+        return rq[::-1]
+
+    def _long_div(self, a, b):
+        m = self.modulus
         a = [x for x in a]
         o = []
         apos = len(a) - 1
         bpos = len(b) - 1
         diff = apos - bpos
+        ilead = self.inv(b[bpos])
         while diff >= 0:
-            quot = self.div(a[apos], b[bpos])
-            o.insert(0, quot)
+            quot = a[apos] * ilead % m
+            o.append(quot)
             for i in range(bpos, -1, -1):
                 a[diff+i] -= b[i] * quot
             apos -= 1
             diff -= 1
-        return [x % self.modulus for x in o]
+        return o[::-1], [x % m for x in a[:bpos]]
+
+    def div_polys(self, a, b):
+        assert len(a) >= len(b)
+        if len(b) == 2:
+            return self.mul_by_const(self.div_by_linear(a, self.div(-b[0], b[1])), self.inv(b[1]))
+        if len(b) >= self.NEWTON_THRESHOLD:
+            return self._div_newton(a, b)
+        return self._long_div(a, b)[0]
 
     def div_polys_with_rem(self, a, b):
         assert len(a) >= len(b)
-        a = [x for x in a]
-        o = []
-        apos = len(a) - 1
-        bpos = len(b) - 1
-        diff = apos - bpos
-        while diff >= 0:
-            quot = self.div(a[apos], b[bpos])
-            o.insert(0, quot)
-            for i in range(bpos, -1, -1):
-                a[diff+i] -= b[i] * quot
-            apos -= 1
-            diff -= 1
-        return [x % self.modulus for x in o], [x % self.modulus for x in a[:apos-1]]
+        if len(b) == 2:
+            o, r = self._div_by_linear(a, self.div(-b[0], b[1]))
+            return self.mul_by_const(o, self.inv(b[1])), [r]
+        if len(b) >= self.NEWTON_THRESHOLD:
+            o = self._div_newton(a, b)
+            # only the low len(b)-1 coefficients of b * o are needed
+            r = len(b) - 1
+            return o, self.sub_polys(a[:r], self.mul_polys(b[:r], o[:r])[:r])
+        return self._long_div(a, b)
 
     def mod_polys(self, a, b):
-        return self.sub_polys(a, self.mul_polys(b, self.div_polys(a, b)))[:len(b)-1]
+        return self.div_polys_with_rem(a, b)[1]
 
     # Build a polynomial from a few coefficients
     def sparse(self, coeff_dict):
@@ -115,6 +238,10 @@ class PrimeField():
 
     # Build a polynomial that returns 0 at all specified xs
     def zpoly(self, xs):
+        if len(xs) >= 2 * self.KARATSUBA_THRESHOLD:
+            # product of the two halves, so large products use fast mul_polys
+            h = len(xs) // 2
+            return self.mul_polys(self.zpoly(xs[:h]), self.zpoly(xs[h:]))
         root = [1]
         for x in xs:
             root.insert(0, 0)
@@ -242,3 +369,110 @@ class PrimeField():
         for i in range(len(c)):
             psc = self.add_polys(psc, self.mul_by_const(ps[i], c[i]))
         return psc
+
+
+# Domain {h * w^i} of n points for polynomials in evaluation form.  It
+# caches everything that only depends on the domain (the points, the
+# barycentric weights, the coset powers and the 1 / (w^i - 1) table), so
+# evaluating many polynomials over it only pays for the per-point inversions.
+class EvaluationDomain():
+    def __init__(self, pf, root_of_unity, n, shift=1):
+        m = pf.modulus
+        self.pf = pf
+        self.root_of_unity = root_of_unity
+        self.n = n
+        self.shift = shift % m
+        self.xs = [self.shift]
+        for i in range(n - 1):
+            self.xs.append(self.xs[-1] * root_of_unity % m)
+        assert self.xs[-1] * root_of_unity % m == self.shift
+        self.hn = pow(shift, n, m)
+        # f(z) = (z^n - h^n) * sum(weights[i] * ys[i] / (z - xs[i]))
+        c = pf.inv(n * self.hn)
+        self.weights = [x * c % m for x in self.xs]
+        self._inv_h2 = pf.inv(shift * shift)
+        self._index = None
+        self._oi1 = None
+        self._coset_powers = {}
+
+    # Position of x in the domain, or None
+    def index(self, x):
+        if self._index is None:
+            self._index = {v: i for i, v in enumerate(self.xs)}
+        return self._index.get(x % self.pf.modulus)
+
+    # [1 / (w^i - 1) for i in range(1, n)]
+    def oi1(self):
+        if self._oi1 is None:
+            m = self.pf.modulus
+            ws = [self.root_of_unity]
+            for i in range(self.n - 2):
+                ws.append(ws[-1] * self.root_of_unity % m)
+            self._oi1 = self.pf.multi_inv([w - 1 for w in ws])
+        return self._oi1
+
+    # 1 / (xs[i] - xs[j]) from the cached table, using
+    # xs[i] - xs[j] = xs[j] * (w^(i-j) - 1)
+    def inv_diff(self, i, j):
+        m = self.pf.modulus
+        oi1 = self.oi1()
+        if i > j:
+            return self.xs[-j] * self._inv_h2 * oi1[i - j - 1] % m
+        return -self.xs[-i] * self._inv_h2 * oi1[j - i - 1] % m
+
+    # Evaluate the polynomial with values ys over the domain at z, O(n)
+    def eval(self, ys, z):
+        return self.eval_many(ys, [z])[0]
+
+    # Evaluate at every z in zs with a single batched inversion
+    def eval_many(self, ys, zs):
+        m = self.pf.modulus
+        n = self.n
+        invs = self.pf.multi_inv([z - x for z in zs for x in self.xs])
+        wys = [w * y % m for w, y in zip(self.weights, ys)]
+        o = []
+        for k, z in enumerate(zs):
+            zn = pow(z, n, m)
+            if zn == self.hn and self.index(z) is not None:
+                o.append(ys[self.index(z)] % m)
+                continue
+            s = sum(a * b for a, b in zip(wys, invs[k*n:(k+1)*n]))
+            o.append(s % m * (zn - self.hn) % m)
+        return o
+
+    # (xs[i]^c, 1 / (c * xs[i]^c)) for the representatives of the n / c
+    # cosets {xs[i + j * n / c]} of size c
+    def coset_powers(self, c):
+        if c not in self._coset_powers:
+            m = self.pf.modulus
+            hc = [pow(x, c, m) for x in self.xs[:self.n // c]]
+            self._coset_powers[c] = (hc, self.pf.multi_inv([c * x % m for x in hc]))
+        return self._coset_powers[c]
+
+    # Evaluate at z the polynomial through each coset of size c, same as
+    # PrimeField.eval_barycentric_all (e.g. the column of an FRI layer)
+    def eval_cosets(self, ys, z, c):
+        m = self.pf.modulus
+        ncosets = self.n // c
+        hc, inv_chc = self.coset_powers(c)
+        invs = self.pf.multi_inv([z - x for x in self.xs])
+        zc = pow(z, c, m)
+        xs = self.xs
+        o = []
+        for i in range(ncosets):
+            s = 0
+            for idx in range(i, self.n, ncosets):
+                s += xs[idx] * ys[idx] * invs[idx]
+            o.append(s % m * (zc - hc[i]) * inv_chc[i] % m)
+        return o
+
+
+_domains = {}
+
+# Shared EvaluationDomain per (modulus, root_of_unity, n, shift), so that
+# every blob / proof over the same domain reuses the cached tables
+def get_evaluation_domain(pf, root_of_unity, n, shift=1):
+    key = (pf.modulus, root_of_unity, n, shift)
+    if key not in _domains:
+        _domains[key] = EvaluationDomain(pf, root_of_unity, n, shift)
+    return _domains[key]
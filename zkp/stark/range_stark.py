@@ -1,26 +1,19 @@
 # A simple STARK code to demonstrate range check
 from poly_utils import PrimeField
 import random
-from fft import fft
+from fft import fft, lde, coset_fft, coset_ifft, GOLDILOCKS
 from merkle_tree import merkelize, mk_branch, verify_branch
 
 check_z_poly = True
 exact_D = False
-
-def shift_poly(poly, modulus, factor):
-    factor_power = 1
-    inv_factor = pow(factor, modulus - 2, modulus)
-    o = []
-    for p in poly:
-        o.append(p * factor_power % modulus)
-        factor_power = factor_power * inv_factor % modulus
-    return o
+# Use the 64-bit Goldilocks field, whose NTTs run on NumPy uint64 kernels
+small_field = False
 
 # number of P(x) values
 n = 1024
 extension_factor = 32
 
-modulus = 2**256 - 2**32 * 351 + 1
+modulus = GOLDILOCKS if small_field else 2**256 - 2**32 * 351 + 1
 f = PrimeField(modulus)
 
 precision = n * extension_factor
@@ -29,9 +22,8 @@ skips = precision // n
 G1 = f.exp(G2, skips)
 
 v = [random.randint(0, 9) for i in range(n)]
-p_poly = fft(v, modulus, G1, inv=True)
 # evaluations of P(x) over G2
-p_evals = fft(p_poly, modulus, G2)
+p_evals = lde(v, modulus, G2, extension_factor)
 
 # evaluations of C(P(x)), where
 # C(x) = x(x-1)(x-2)...(x-10)
@@ -49,22 +41,19 @@ cp_poly = fft(cp_evals, modulus, G2, inv=True)
 print("Generating D(x)")
 
 if exact_D:
+    # evaluate over the coset 7 * G2, where Z(x) has no zeros
     shift = 7
-    shift_inv = f.inv(shift)
-    shifted_cp_poly = shift_poly(cp_poly, modulus, shift)
-    shifted_cp_evals = fft(shifted_cp_poly, modulus, G2)
-    shifted_z_poly = shift_poly([modulus - 1] + [0] * (n - 1) + [1], modulus, shift)
-    shifted_z_poly_evals = fft(shifted_z_poly, modulus, G2)
+    shifted_cp_evals = coset_fft(cp_poly, modulus, G2, shift)
+    shifted_z_poly_evals = coset_fft([modulus - 1] + [0] * (n - 1) + [1], modulus, G2, shift)
     shifted_d_evals = [f.div(x, y) for x, y in zip(shifted_cp_evals, shifted_z_poly_evals)]
-    shifted_d_poly = fft(shifted_d_evals, modulus, G2, inv=True)
-    d_poly = shift_poly(shifted_d_poly, modulus, shift_inv)
+    d_poly = coset_ifft(shifted_d_evals, modulus, G2, shift)
     d_evals = fft(d_poly, modulus, G2)
 else:
     xs = f.get_power_cycle(G2)
     z_poly_evals = [xs[(i * n) % precision] - 1 for i in range(precision)]
     inv_z_poly_evals = f.multi_inv(z_poly_evals)
 
-    d_evals = [cp * iz % modulus for cp, iz in zip(cp_evals, inv_z_poly_evals)]
+    d_evals = f.mul_vec(cp_evals, inv_z_poly_evals)
     d_poly = fft(d_evals, modulus, G2, inv=True)
 
 print("Generated D(x), degree = %d" %  f.degree(d_poly))
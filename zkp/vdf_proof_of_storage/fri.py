@@ -1,6 +1,6 @@
 from permuted_tree import merkelize, mk_branch, verify_branch, mk_multi_branch, verify_multi_branch
 from utils import get_power_cycle, get_pseudorandom_indices
-from poly_utils import PrimeField
+from poly_utils import PrimeField, get_evaluation_domain
 
 # Generate an FRI proof that the polynomial that has the specified
 # values at successive powers of the specified root of unity has a
@@ -20,8 +20,8 @@ def prove_low_degree(values, root_of_unity, maxdeg_plus_1, modulus, exclude_mult
         return [[x.to_bytes(32, 'big') for x in values]]
 
     # Calculate the set of x coordinates
-    xs = get_power_cycle(root_of_unity, modulus)
-    assert len(values) == len(xs)
+    domain = get_evaluation_domain(f, root_of_unity, len(values))
+    xs = domain.xs
 
     # Put the values into a Merkle tree. This is the root that the
     # proof will be checked against
@@ -39,7 +39,7 @@ def prove_low_degree(values, root_of_unity, maxdeg_plus_1, modulus, exclude_mult
     # column = [f.eval_barycentric(special_x,
     #     [xs[i+quarter_len*j] for j in range(4)],
     #     [values[i+quarter_len*j] for j in range(4)]) for i in range(quarter_len)]
-    column = f.eval_barycentric_all(special_x, xs, values, 4)
+    column = domain.eval_cosets(values, special_x, 4)
     # Evaluate the polynomial using Lagrange interpolation
     # x_polys = f.multi_interp_4(
     #     [[xs[i+quarter_len*j] for j in range(4)] for i in range(quarter_len)],
@@ -1,7 +1,7 @@
 from permuted_tree import merkelize, mk_branch, verify_branch, blake, mk_multi_branch, verify_multi_branch
 from poly_utils import PrimeField
 import time
-from fft import fft
+from fft import fft, lde
 from fri import prove_low_degree, verify_low_degree_proof
 from utils import get_power_cycle, get_pseudorandom_indices, is_a_power_of_2
 
@@ -22,12 +22,12 @@ def mimc(inp, steps, round_constants):
 
 def mimc_encode(inp, steps, round_constants):
     for i in reversed(range(steps-1)):
-        inp = (pow((inp - round_constants[i % len(round_constants)]) % modulus, (2 * modulus - 1) // 3, modulus)) % modulus
+        inp = f.exp((inp - round_constants[i % len(round_constants)]) % modulus, (2 * modulus - 1) // 3)
     return inp
 
 def mimc_decode(inp, steps, round_constants):
     for i in range(steps-1):
-        inp = (pow(inp, 3, modulus) + round_constants[i % len(round_constants)]) % modulus
+        inp = (f.exp(inp, 3) + round_constants[i % len(round_constants)]) % modulus
     return inp
 
 # Generate a STARK for a MIMC calculation
@@ -62,8 +62,7 @@ def mk_mimc_proof(inp, steps, round_constants):
 
     # Interpolate the computational trace into a polynomial P, with each step
     # along a successive power of G1
-    computational_trace_polynomial = fft(computational_trace, modulus, G1, inv=True)
-    p_evaluations = fft(computational_trace_polynomial, modulus, G2)
+    p_evaluations = lde(computational_trace, modulus, G2, extension_factor)
     # print('Converted computational steps into a polynomial and low-degree extended it')
 
     skips2 = steps // len(round_constants)